@@ -0,0 +1,105 @@
+import warnings
+
+import numpy as np
+
+from time_buckets import MONTHS, monthly_matrix
+
+
+# Robust z-scores use the median and MAD (scaled to a standard deviation) of a baseline.
+# A month is flagged when it deviates from both its seasonal baseline (the same month in
+# prior years) and its trailing window in the same direction, so seasonal peaks such as
+# festive months are not flagged just because the previous months were quieter.
+Z_THRESHOLD = 3.5
+TRAILING_MONTHS = 6
+MIN_SEASONAL_YEARS = 2
+MIN_TRAILING_MONTHS = 3
+MIN_VOLUME = 50
+
+
+def robust_z(values, baseline, min_periods):
+    """
+    Robust z-score of `values` (entity x month) against `baseline` (entity x month x window).
+
+    Where the MAD is zero the mean absolute deviation is used instead (scaled by 1.2533), and
+    the scale never drops below one registration. NaN where the baseline has fewer than
+    `min_periods` observations.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(baseline, axis=2)
+        deviation = np.abs(baseline - median[:, :, None])
+        scale = 1.4826 * np.nanmedian(deviation, axis=2)
+        scale = np.where(scale > 0, scale, 1.2533 * np.nanmean(deviation, axis=2))
+    scale = np.fmax(scale, 1.0)
+    enough = (~np.isnan(baseline)).sum(axis=2) >= min_periods
+    z = np.where(enough, (values - median) / scale, np.nan)
+    return np.where(enough, median, np.nan), z
+
+
+def score_anomalies(long_df, id_cols, value_col='Registrations', z_threshold=Z_THRESHOLD,
+                    trailing_months=TRAILING_MONTHS, min_volume=MIN_VOLUME, month_keys=None, recent_first=True):
+    """
+    Score entity-months of a long monthly frame (Month_Key rows, see time_buckets) against
+    their seasonal and trailing baselines, and return the flagged months.
+
+    All entities are scored at once on one entity x month matrix; `month_keys` limits the
+    scoring to those months (the rest of the frame then only serves as history). The combined
+    score is the smaller of the two z-scores when both exist and agree in sign (0 when they
+    disagree), or the one that exists. Months where neither the value nor its baseline
+    reaches `min_volume` registrations are never flagged. The flags are ordered by
+    sort_anomalies.
+    """
+    entities, first_key, values, _ = monthly_matrix(long_df, id_cols, value_col)
+    all_keys = first_key + np.arange(values.shape[1])
+    cols = np.arange(values.shape[1]) if month_keys is None else np.flatnonzero(np.isin(all_keys, month_keys))
+
+    # Baseline windows gathered by column index: entity x scored month x lag, where lags
+    # before the first month read the leading all-NaN column
+    padded = np.hstack([np.full((values.shape[0], 1), np.nan), values])
+
+    def lagged(lags):
+        index = cols[:, None] - lags[None, :]
+        return padded[:, np.where(index >= 0, index + 1, 0)]
+
+    target = values[:, cols]
+
+    # Same calendar month in every prior year covered by the matrix
+    years = max(values.shape[1] // 12, 1)
+    seasonal_median, seasonal_z = robust_z(target, lagged(12 * np.arange(1, years + 1)), MIN_SEASONAL_YEARS)
+
+    # The preceding `trailing_months` months
+    trailing_median, trailing_z = robust_z(target, lagged(np.arange(trailing_months, 0, -1)), MIN_TRAILING_MONTHS)
+
+    both = ~np.isnan(seasonal_z) & ~np.isnan(trailing_z)
+    agree = np.sign(seasonal_z) == np.sign(trailing_z)
+    combined = np.where(np.abs(seasonal_z) < np.abs(trailing_z), seasonal_z, trailing_z)
+    either = np.where(np.isnan(seasonal_z), trailing_z, seasonal_z)
+    score = np.where(both, np.where(agree, combined, 0.0), either)
+
+    volume = np.fmax(target, np.fmax(seasonal_median, trailing_median))
+    flagged = (np.abs(score) >= z_threshold) & (volume >= min_volume)
+
+    rows, scored = np.nonzero(flagged)
+    anomalies = entities.iloc[rows].reset_index(drop=True)
+    flagged_keys = all_keys[cols[scored]]
+    anomalies['Year'] = flagged_keys // 12
+    anomalies['Month'] = [MONTHS[month] for month in flagged_keys % 12]
+    anomalies['Month_Key'] = flagged_keys
+    anomalies[value_col] = target[rows, scored]
+    anomalies['Seasonal_median'] = seasonal_median[rows, scored]
+    anomalies['Seasonal_z'] = seasonal_z[rows, scored].round(2)
+    anomalies['Trailing_median'] = trailing_median[rows, scored]
+    anomalies['Trailing_z'] = trailing_z[rows, scored].round(2)
+    anomalies['Score'] = score[rows, scored].round(2)
+    anomalies['Direction'] = np.where(score[rows, scored] > 0, 'spike', 'drop')
+    return sort_anomalies(anomalies, recent_first)
+
+
+def sort_anomalies(anomalies, recent_first=True):
+    """
+    Most recent months first (oldest first without `recent_first`, as the pipelines store
+    them), strongest deviations first within a month.
+    """
+    month_keys = anomalies['Month_Key'].to_numpy()
+    order = np.lexsort((-anomalies['Score'].abs().to_numpy(), -month_keys if recent_first else month_keys))
+    return anomalies.iloc[order].reset_index(drop=True)
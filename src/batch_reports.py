@@ -0,0 +1,197 @@
+import argparse
+import html
+import itertools
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from plotly.offline import get_plotlyjs
+
+from dashboard_data import (
+    default_processed_dir,
+    filter_data,
+    latest_performers,
+    load_dashboard_data,
+    top_maker_ids,
+    yoy_caption,
+)
+from figures import (
+    latest_top_makers_figure,
+    latest_vc_figure,
+    maker_trends_figure,
+    qoq_growth_figure,
+    top_makers_figure,
+    vc_trend_figure,
+    yoy_growth_figure,
+)
+
+
+PLOTLY_JS_FILENAME = "plotly.min.js"
+
+# Frames shared by every report rendered in this process; filled once per worker
+_FRAMES = None
+
+# Rendered chart fragments keyed by the filters they depend on, reused across reports in a worker
+_FRAGMENTS = {}
+
+
+def _init_worker(processed_dir):
+    global _FRAMES
+    if _FRAMES is None:
+        # The pipelines' snapshot, unless it is stale and the CSVs have to be read instead
+        _FRAMES = load_dashboard_data(processed_dir)[0]
+
+
+def default_report_specs(frames, top_n=10, window_sizes=(3, 5)):
+    """One spec per vehicle group x top maker x trailing year window."""
+    vc_data, maker_data, _, _ = frames
+    years = sorted(vc_data["Year"].unique().tolist())
+    groups = sorted(vc_data["Group"].unique().tolist())
+    maker_names = maker_data.groupby("Maker_ID")["Maker"].first()
+
+    specs = []
+    for group, maker_id, window in itertools.product(groups, top_maker_ids(maker_data, n=top_n), window_sizes):
+        window_years = years[-window:]
+        specs.append({
+            "name": f"{group}_maker{maker_id}_{window_years[0]}-{window_years[-1]}",
+            "title": f"{group} | {maker_names[maker_id]} | {window_years[0]}-{window_years[-1]}",
+            "years": window_years,
+            "categories": [group],
+            "makers": [int(maker_id)],
+        })
+    return specs
+
+
+def _report_filename(spec):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", spec["name"]) + ".html"
+
+
+def _metric(label, value):
+    return f'<div class="metric"><h4>{html.escape(label)}</h4><h3>{html.escape(value)}</h3></div>'
+
+
+def _charts_html(figures):
+    return "\n".join(f'<div class="chart">{fig.to_html(full_html=False, include_plotlyjs=False)}</div>' for fig in figures)
+
+
+def _vehicle_section(filtered):
+    vc_filtered, vc_qoq_filtered = filtered["vc"], filtered["vc_qoq"]
+    metrics = []
+    figures = []
+    if not vc_filtered.empty:
+        metrics.append(_metric("Total Registrations", f"{vc_filtered['Registrations'].sum():,}"))
+        best_performer, worst_performer = latest_performers(vc_filtered)
+        if best_performer is not None:
+            metrics.append(_metric("Best Performer", f"{best_performer['Group']} ({yoy_caption(best_performer)})"))
+            metrics.append(_metric("Needs Attention", f"{worst_performer['Group']} ({yoy_caption(worst_performer)})"))
+        figures += [vc_trend_figure(vc_filtered), yoy_growth_figure(vc_filtered), latest_vc_figure(vc_filtered)]
+    if not vc_qoq_filtered.empty:
+        figures.append(qoq_growth_figure(vc_qoq_filtered))
+    return "".join(metrics), _charts_html(figures)
+
+
+def _maker_section(filtered):
+    maker_filtered = filtered["maker"]
+    if maker_filtered.empty:
+        return ""
+    return _charts_html([top_makers_figure(maker_filtered), maker_trends_figure(maker_filtered), latest_top_makers_figure(maker_filtered)])
+
+
+def _cached(cache, key, build):
+    if cache is None:
+        return build()
+    if key not in cache:
+        cache[key] = build()
+    return cache[key]
+
+
+def render_report_html(spec, frames, fragment_cache=None):
+    """
+    Render one filter spec with the dashboard's figures as a standalone HTML page.
+
+    Vehicle-category charts only depend on years/categories and maker charts on
+    years/makers, so with a `fragment_cache` dict they are rendered once per
+    distinct filter and shared by every report that uses it.
+    """
+    years, categories, makers = spec.get("years"), spec.get("categories"), spec.get("makers")
+    filtered = filter_data(*frames, years=years, categories=categories, makers=makers)
+
+    def key(*values):
+        return tuple(tuple(value or ()) for value in values)
+
+    metrics, vc_charts = _cached(fragment_cache, ("vc",) + key(years, categories), lambda: _vehicle_section(filtered))
+    maker_charts = _cached(fragment_cache, ("maker",) + key(years, makers), lambda: _maker_section(filtered))
+    charts = vc_charts + "\n" + maker_charts
+    title = html.escape(spec.get("title", spec["name"]))
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{PLOTLY_JS_FILENAME}"></script>
+<style>
+    body {{ font-family: sans-serif; margin: 2rem; }}
+    .metrics {{ display: flex; gap: 1rem; }}
+    .metric {{ background-color: #f0f2f6; padding: 1rem; border-radius: 0.5rem; border-left: 4px solid #1f77b4; }}
+    .metric h4, .metric h3 {{ margin: 0.2rem 0; }}
+</style>
+</head>
+<body>
+<h1>🚗 Vehicle Registration Report: {title}</h1>
+<div class="metrics">{metrics}</div>
+{charts}
+</body>
+</html>
+"""
+
+
+def _render_to_file(spec, output_dir):
+    path = os.path.join(output_dir, _report_filename(spec))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_report_html(spec, _FRAMES, _FRAGMENTS))
+    return path
+
+
+def render_reports(specs, output_dir, processed_dir=None, workers=None):
+    """Render every spec to `output_dir` on a process pool; returns the report paths."""
+    processed_dir = processed_dir or default_processed_dir()
+    os.makedirs(output_dir, exist_ok=True)
+
+    # plotly.js is written once and shared by all reports instead of being inlined into each
+    with open(os.path.join(output_dir, PLOTLY_JS_FILENAME), "w", encoding="utf-8") as f:
+        f.write(get_plotlyjs())
+
+    # Loading in the parent lets forked workers inherit the frames without loading them again
+    _init_worker(processed_dir)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(processed_dir,)) as pool:
+        chunksize = max(1, len(specs) // ((workers or os.cpu_count() or 1) * 4))
+        return list(pool.map(_render_to_file, specs, itertools.repeat(output_dir), chunksize=chunksize))
+
+
+def main():
+    project_root = os.path.dirname(os.path.dirname(__file__))
+    parser = argparse.ArgumentParser(description="Render static dashboard reports for many filter combinations.")
+    parser.add_argument("--specs", help="JSON file with a list of specs (name, years, categories, makers)")
+    parser.add_argument("--output-dir", default=os.path.join(project_root, "reports"))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top-makers", type=int, default=10, help="Top makers used when no specs file is given")
+    args = parser.parse_args()
+
+    if args.specs:
+        with open(args.specs, encoding="utf-8") as f:
+            specs = json.load(f)
+    else:
+        _init_worker(default_processed_dir())
+        specs = default_report_specs(_FRAMES, top_n=args.top_makers)
+
+    print(f"Rendering {len(specs)} reports...")
+    start = time.perf_counter()
+    paths = render_reports(specs, args.output_dir, workers=args.workers)
+    print(f"Rendered {len(paths)} reports in {time.perf_counter() - start:.1f}s")
+    print(f"Saved to: {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
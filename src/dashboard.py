@@ -1,8 +1,11 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
+import hmac
 import os
 
+import streamlit as st
+
+# pandas and plotly are imported lazily inside load_data()/main() so the page shell
+# renders before the data and plotting stacks are loaded on a cold start
+
 # Page configuration
 st.set_page_config(
     page_title="Vehicle Registration Dashboard",
@@ -77,26 +80,71 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 @st.cache_data
+def load_options():
+    """Load the sidebar option lists from the snapshot header, without importing pandas."""
+    from snapshot import default_processed_dir, load_snapshot
+    snapshot = load_snapshot(default_processed_dir(), with_frames=False)
+    if snapshot is not None:
+        return snapshot["options"]
+    from dashboard_data import load_sidebar_options
+    return load_sidebar_options(default_processed_dir())
+
+@st.cache_resource
+def load_shared_data():
+    """Load processed data frames once per process, preferring the prebuilt snapshot over the CSVs."""
+    from dashboard_data import default_processed_dir
+    from pipeline_refresh import DataStore
+    return DataStore(default_processed_dir())
+
+@st.cache_resource
+def load_refresh_job():
+    """The process-wide background refresh; a completed refresh swaps its data into the shared store."""
+    from pipeline_refresh import RefreshJob
+    return RefreshJob(load_shared_data(), on_swap=load_options.clear)
+
 def load_data():
-    """Load processed data files."""
-    project_root = os.path.dirname(os.path.dirname(__file__))
-    data_dir = os.path.join(project_root, "data", "processed")
-    
-    # Load yearly data
-    vc_data = pd.read_csv(os.path.join(data_dir, "vehicle_category_group_yoy.csv"))
-    maker_data = pd.read_csv(os.path.join(data_dir, "maker_yoy.csv"))
-    
-    # Load quarterly data
-    vc_qoq_data = pd.read_csv(os.path.join(data_dir, "vehicle_category_quarterly_qoq.csv"))
-    maker_qoq_data = pd.read_csv(os.path.join(data_dir, "maker_quarterly_qoq.csv"))
-    
-    # Convert empty strings back to NaN for calculations
-    vc_data['YoY_pct'] = pd.to_numeric(vc_data['YoY_pct'], errors='coerce')
-    maker_data['YoY_pct'] = pd.to_numeric(maker_data['YoY_pct'], errors='coerce')
-    vc_qoq_data['QoQ_pct'] = pd.to_numeric(vc_qoq_data['QoQ_pct'], errors='coerce')
-    maker_qoq_data['QoQ_pct'] = pd.to_numeric(maker_qoq_data['QoQ_pct'], errors='coerce')
-    
-    return vc_data, maker_data, vc_qoq_data, maker_qoq_data
+    """Zero-copy views of the served frames and extra tables for this session, and their data version."""
+    from dashboard_data import session_views
+    frames, extras, _, version = load_shared_data().current
+    return (*session_views(frames, extras), version)
+
+@st.fragment(run_every=2)
+def refresh_panel():
+    """Start a background refresh and follow its progress, polling without rerunning the page."""
+    from pipeline_refresh import REFRESH_MODES
+    job = load_refresh_job()
+    mode = st.radio("Mode:", list(REFRESH_MODES), horizontal=True,
+                    help="incremental patches newly appended months; full rebuilds every output")
+    if st.button("🔄 Refresh data", disabled=job.status()["state"] == "running"):
+        job.start(mode)
+    
+    status = job.status()
+    if status["state"] == "running":
+        st.progress(
+            max(status["step"] - 1, 0) / len(status["steps"]),
+            text=f"Step {status['step']}/{len(status['steps'])}: {status.get('current', '')}"
+        )
+        st.caption("The current data stays available until the refresh completes.")
+    elif status["state"] == "succeeded":
+        st.success(f"Refreshed in {status['finished_at'] - status['started_at']:.0f}s")
+    elif status["state"] == "failed":
+        st.error(f"Refresh failed, still serving the previous data: {status['error']}")
+    if status["log"]:
+        st.code("\n".join(status["log"][-15:]), language=None)
+    
+    # Show the swapped-in data as soon as it is served
+    if load_shared_data().current[3] != st.session_state.get("data_version"):
+        st.rerun()
+
+def admin_controls():
+    """Data refresh controls, shown only when DASHBOARD_ADMIN_TOKEN is set and entered."""
+    admin_token = os.environ.get("DASHBOARD_ADMIN_TOKEN")
+    if not admin_token:
+        return
+    with st.sidebar.expander("⚙️ Data Refresh (admin)"):
+        token = st.text_input("Admin token:", type="password")
+        if token and hmac.compare_digest(token.encode(), admin_token.encode()):
+            refresh_panel()
 
 def main():
     # Header
@@ -106,14 +154,14 @@ def main():
     # st.image("https://prodimages.everythingneon.com/350/l102-0938-auto-registration-animated-led-sign.gif", 
     #         width=200)
     
-    # Load data
-    vc_data, maker_data, vc_qoq_data, maker_qoq_data = load_data()
+    # Sidebar options come from the snapshot header; the frames are loaded after the filters render
+    options = load_options()
     
     # Sidebar filters
     st.sidebar.header("📊 Filters")
     
     # Year range filter
-    years = sorted(vc_data['Year'].unique())
+    years = options['years']
     selected_years = st.sidebar.multiselect(
         "Select Years:",
         years,
@@ -122,7 +170,7 @@ def main():
     )
     
     # Vehicle category filter
-    categories = sorted(vc_data['Group'].unique())
+    categories = options['categories']
     selected_categories = st.sidebar.multiselect(
         "Vehicle Categories:",
         categories,
@@ -133,30 +181,36 @@ def main():
     # Manufacturer filter
     st.sidebar.subheader("🏭 Manufacturer Selection")
     
-    # Top manufacturers by performance
-    top_makers = maker_data.groupby('Maker')['Registrations'].sum().sort_values(ascending=False).head(20).index.tolist()
+    # Top manufacturers by performance, keyed on stable maker IDs
+    maker_names = options['maker_names']
+    top_makers = options['top_makers']
     
     # Simple manufacturer selection
     selected_makers = st.sidebar.multiselect(
         "Select Manufacturers:",
         top_makers,
         default=top_makers[:5] if len(top_makers) >= 5 else top_makers,
+        format_func=lambda maker_id: maker_names[maker_id],
         help="Select manufacturers to analyze"
     )
     
-    # Filter data based on selections
-    if selected_years:
-        vc_filtered = vc_data[vc_data['Year'].isin(selected_years)]
-        maker_filtered = maker_data[maker_data['Year'].isin(selected_years)]
-    else:
-        vc_filtered = vc_data
-        maker_filtered = maker_data
-    
-    if selected_categories:
-        vc_filtered = vc_filtered[vc_filtered['Group'].isin(selected_categories)]
+    # Load data
+    (vc_data, maker_data, vc_qoq_data, maker_qoq_data), extras, data_version = load_data()
+    st.session_state["data_version"] = data_version
+    admin_controls()
+    import pandas as pd
+    from dashboard_data import default_processed_dir, filter_data, filter_extra, latest_performers, yoy_caption
     
-    if selected_makers:
-        maker_filtered = maker_filtered[maker_filtered['Maker'].isin(selected_makers)]
+    # Filter data based on selections
+    filtered = filter_data(
+        vc_data, maker_data, vc_qoq_data, maker_qoq_data,
+        years=selected_years, categories=selected_categories, makers=selected_makers
+    )
+    vc_filtered = filtered['vc']
+    maker_filtered = filtered['maker']
+    vc_qoq_filtered = filtered['vc_qoq']
+    maker_qoq_filtered = filtered['maker_qoq']
+    best_performer, worst_performer = latest_performers(vc_filtered)
     
     # Section 1: Overview & Key Metrics
     st.subheader("📊 Overview & Key Metrics")
@@ -190,10 +244,7 @@ def main():
     
     with col2:
         if not vc_filtered.empty:
-            latest_year = vc_filtered['Year'].max()
-            latest_data = vc_filtered[vc_filtered['Year'] == latest_year]
-            if not latest_data.empty:
-                best_performer = latest_data.loc[latest_data['YoY_pct'].idxmax()]
+            if best_performer is not None:
                 st.markdown(f"""
                 <div style="
                     background-color: #1f1f1f;
@@ -208,15 +259,14 @@ def main():
                         </span>
                     </h4>
                     <h3 style="color: #28a745; margin: 0.5rem 0; font-size: 1.5rem; font-weight: bold;">{best_performer['Group']}</h3>
-                    <p style="color: #cccccc; margin: 0; font-size: 0.9rem;">{best_performer['YoY_pct']:.1f}% YoY</p>
+                    <p style="color: #cccccc; margin: 0; font-size: 0.9rem;">{yoy_caption(best_performer)}</p>
                     <p style="color: #999999; margin: 0.2rem 0 0 0; font-size: 0.7rem; font-style: italic;">Highest growth rate</p>
                 </div>
                 """, unsafe_allow_html=True)
     
     with col3:
         if not vc_filtered.empty:
-            if not latest_data.empty:
-                worst_performer = latest_data.loc[latest_data['YoY_pct'].idxmin()]
+            if worst_performer is not None:
                 st.markdown(f"""
                 <div style="
                     background-color: #1f1f1f;
@@ -231,7 +281,7 @@ def main():
                                         </span>
                                     </h4>
                 <h3 style="color: #dc3545; margin: 0.5rem 0; font-size: 1.5rem; font-weight: bold;">{worst_performer['Group']}</h3>
-                <p style="color: #cccccc; margin: 0; font-size: 0.9rem;">{worst_performer['YoY_pct']:.1f}% YoY</p>
+                <p style="color: #cccccc; margin: 0; font-size: 0.9rem;">{yoy_caption(worst_performer)}</p>
                 <p style="color: #999999; margin: 0.2rem 0 0 0; font-size: 0.7rem; font-style: italic;">Lowest growth rate</p>
                 </div>
                 """, unsafe_allow_html=True)
@@ -239,22 +289,27 @@ def main():
     st.write("")  # Add spacing
     
     # Section 2: Main Trends
+    from figure_cache import cached_figure
+    from figures import (
+        concentration_figure,
+        latest_top_makers_figure,
+        latest_vc_figure,
+        maker_qoq_figure,
+        maker_trends_figure,
+        market_share_figure,
+        qoq_growth_figure,
+        top_makers_figure,
+        vc_trend_figure,
+        yoy_growth_figure,
+        ytd_growth_figure,
+    )
     st.subheader("📈 Registration Trends")
     
     col1, col2 = st.columns([2, 1])
     
     with col1:
         # Main trend chart
-        fig_vc = px.line(
-            vc_filtered,
-            x='Year',
-            y='Registrations',
-            color='Group',
-            title='Vehicle Registration Trends Over Time',
-            labels={'Registrations': 'Total Registrations', 'Year': 'Year'},
-            markers=True
-        )
-        fig_vc.update_layout(height=400)
+        fig_vc = vc_trend_figure(vc_filtered)
         st.plotly_chart(fig_vc, use_container_width=True)
     
     with col2:
@@ -292,47 +347,28 @@ def main():
     with col1:
         # YoY growth chart
         if not vc_filtered.empty:
-            fig_yoy_bars = px.bar(
-                vc_filtered,
-                x='Year',
-                y='YoY_pct',
-                color='Group',
-                title='Year-over-Year [YoY] Growth by Vehicle Category',
-                barmode='group',
-                labels={'YoY_pct': 'YoY Growth (%)', 'Year': 'Year'},
-                color_discrete_map={'2W': '#1f77b4', '3W': '#ff7f0e', '4W': '#2ca02c'}
-            )
-            fig_yoy_bars.update_layout(height=400, xaxis_tickangle=0)
-            fig_yoy_bars.update_traces(texttemplate='%{y:.1f}%', textposition='outside')
+            fig_yoy_bars = yoy_growth_figure(vc_filtered)
             st.plotly_chart(fig_yoy_bars, use_container_width=True)
     
     with col2:
             # QoQ growth chart
             if not vc_qoq_data.empty:
-                # Filter QoQ data based on selections
-                if selected_years:
-                    vc_qoq_filtered = vc_qoq_data[vc_qoq_data['Year'].isin(selected_years)]
-                else:
-                    vc_qoq_filtered = vc_qoq_data
-                
-                if selected_categories:
-                    vc_qoq_filtered = vc_qoq_filtered[vc_qoq_filtered['Group'].isin(selected_categories)]
-                
                 if not vc_qoq_filtered.empty:
-                    fig_qoq_line = px.line(
-                        vc_qoq_filtered,
-                        x='Year_Quarter',
-                        y='QoQ_pct',
-                        color='Group',
-                        title='Quarter-over-Quarter [QoQ] Growth Trends',
-                        labels={'QoQ_pct': 'QoQ Growth (%)', 'Year_Quarter': 'Year-Quarter'},
-                        markers=True,
-                        color_discrete_map={'2W': '#1f77b4', '3W': '#ff7f0e', '4W': '#2ca02c'}
-                    )
-                    fig_qoq_line.update_layout(height=400, xaxis_tickangle=-45)
-                    fig_qoq_line.update_traces(mode='lines+markers', marker_size=8)
+                    fig_qoq_line = qoq_growth_figure(vc_qoq_filtered)
                     st.plotly_chart(fig_qoq_line, use_container_width=True)
     
+    # Partial-year growth through every cutoff month, from the pipeline's YTD cube
+    if 'vehicle_category_ytd_cube' in extras:
+        ytd_cube = filter_extra(extras['vehicle_category_ytd_cube'], years=selected_years, categories=selected_categories)
+        ytd_cube = ytd_cube[ytd_cube['Year'] == ytd_cube['Year'].max()] if not ytd_cube.empty else ytd_cube
+        if ytd_cube['Prior_YTD_Registrations'].notna().any():
+            st.plotly_chart(ytd_growth_figure(ytd_cube[~ytd_cube['Partial_Month']]), use_container_width=True)
+            if ytd_cube['Partial_Month'].any():
+                st.caption(
+                    f"{ytd_cube.loc[ytd_cube['Partial_Month'], 'Through_Month'].iloc[0]} is left out: "
+                    "its data covers only part of the month."
+                )
+    
     # Section 4: Manufacturer Analysis
     st.subheader("🏭 Manufacturer Performance")
     
@@ -341,31 +377,145 @@ def main():
     with col1:
         # Top manufacturers
         if not maker_filtered.empty:
-            top_makers_summary = maker_filtered.groupby('Maker')['Registrations'].sum().sort_values(ascending=False).head(10)
-            fig_makers = px.bar(
-                x=top_makers_summary.values,
-                y=top_makers_summary.index,
-                orientation='h',
-                title='Top 10 Manufacturers by Total Registrations',
-                labels={'x': 'Total Registrations', 'y': 'Manufacturer'}
-            )
-            fig_makers.update_layout(height=400)
+            fig_makers = top_makers_figure(maker_filtered)
             st.plotly_chart(fig_makers, use_container_width=True)
     
     with col2:
-        # Manufacturer trends
+        # Manufacturer trends (one trace per maker, so served from the figure cache)
         if not maker_filtered.empty:
-            fig_maker_trends = px.line(
-                maker_filtered,
-                x='Year',
-                y='Registrations',
-                color='Maker',
-                title='Manufacturer Registration Trends',
-                labels={'Registrations': 'Total Registrations', 'Year': 'Year'}
+            fig_maker_trends = cached_figure(
+                default_processed_dir(), "maker_trends",
+                {"years": selected_years, "makers": selected_makers},
+                lambda: maker_trends_figure(maker_filtered),
+                version=data_version
             )
-            fig_maker_trends.update_layout(height=400)
             st.plotly_chart(fig_maker_trends, use_container_width=True)
     
+    # Manufacturer QoQ growth
+    if not maker_qoq_filtered.empty:
+        fig_maker_qoq = cached_figure(
+            default_processed_dir(), "maker_qoq",
+            {"years": selected_years, "makers": selected_makers},
+            lambda: maker_qoq_figure(maker_qoq_filtered),
+            version=data_version
+        )
+        st.plotly_chart(fig_maker_qoq, use_container_width=True)
+    
+    # Section 4b: Market Share & Concentration (precomputed by the pipelines)
+    if 'maker_concentration_yearly' in extras and 'maker_share_quarterly' in extras:
+        st.subheader("🥧 Market Share & Concentration")
+        
+        concentration_yearly = filter_extra(extras['maker_concentration_yearly'], years=selected_years)
+        if not concentration_yearly.empty:
+            latest_concentration = concentration_yearly.sort_values('Year').iloc[-1]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(
+                    f"HHI ({int(latest_concentration['Year'])})",
+                    f"{latest_concentration['HHI']:,.0f}",
+                    delta=None if pd.isna(latest_concentration['HHI_change']) else f"{latest_concentration['HHI_change']:+,.0f}",
+                    delta_color="inverse",
+                    help="Herfindahl-Hirschman index of manufacturer shares (0-10,000); higher means a more concentrated market"
+                )
+            with col2:
+                st.metric(
+                    f"Top 5 Share ({int(latest_concentration['Year'])})",
+                    f"{latest_concentration['Top5_share_pct']:.1f}%",
+                    help="Combined share of registrations of the five largest manufacturers"
+                )
+            with col3:
+                st.metric(
+                    f"Active Manufacturers ({int(latest_concentration['Year'])})",
+                    f"{int(latest_concentration['Active_Makers']):,}"
+                )
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            share_quarterly = filter_extra(extras['maker_share_quarterly'], years=selected_years, makers=selected_makers)
+            if selected_makers and not share_quarterly.empty:
+                fig_share = cached_figure(
+                    default_processed_dir(), "market_share",
+                    {"years": selected_years, "makers": selected_makers},
+                    lambda: market_share_figure(share_quarterly.sort_values('Quarter_Key')),
+                    version=data_version
+                )
+                st.plotly_chart(fig_share, use_container_width=True)
+        
+        with col2:
+            if 'maker_concentration_quarterly' in extras:
+                concentration_quarterly = filter_extra(extras['maker_concentration_quarterly'], years=selected_years)
+                if not concentration_quarterly.empty:
+                    fig_concentration = concentration_figure(concentration_quarterly.sort_values('Quarter_Key'))
+                    st.plotly_chart(fig_concentration, use_container_width=True)
+    
+    # Section 4c: Rank movers (precomputed by the pipelines)
+    if 'maker_movers_yearly' in extras and 'maker_movers_quarterly' in extras:
+        st.subheader("🔀 Biggest Rank Movers")
+        st.caption("Manufacturers gaining or losing the most rank positions, among those ranked in the top 50 in either period.")
+        
+        mover_cols = ['Position', 'Maker', 'Previous_Rank', 'Rank', 'Rank_change', 'Registrations']
+        
+        def show_movers(movers, title):
+            st.markdown(f"**{title}**")
+            col1, col2 = st.columns(2)
+            for col, direction in ((col1, 'Gainer'), (col2, 'Loser')):
+                with col:
+                    st.dataframe(
+                        movers[movers['Direction'] == direction][mover_cols],
+                        use_container_width=True,
+                        hide_index=True
+                    )
+        
+        movers_yearly = filter_extra(extras['maker_movers_yearly'], years=selected_years)
+        if not movers_yearly.empty:
+            latest_year = movers_yearly['Year'].max()
+            show_movers(movers_yearly[movers_yearly['Year'] == latest_year], f"{int(latest_year)} vs {int(latest_year) - 1}")
+        
+        movers_quarterly = filter_extra(extras['maker_movers_quarterly'], years=selected_years)
+        if not movers_quarterly.empty:
+            comparison = st.radio("Quarterly comparison:", ['QoQ', 'YoY'], horizontal=True)
+            movers_quarterly = movers_quarterly[movers_quarterly['Comparison'] == comparison]
+            if not movers_quarterly.empty:
+                latest = movers_quarterly[movers_quarterly['Quarter_Key'] == movers_quarterly['Quarter_Key'].max()]
+                show_movers(latest, f"{latest['Year_Quarter'].iloc[0]} ({comparison})")
+    
+    # Section 4d: Anomaly flags (scored by the monthly pipeline)
+    if 'vehicle_category_anomalies' in extras and 'maker_anomalies' in extras:
+        st.subheader("🚨 Unusual Months")
+        st.caption(
+            "Months whose registrations deviate strongly (robust z-score ≥ 3.5) from both the same month "
+            "in prior years and the preceding six months."
+        )
+        
+        from anomaly_detection import sort_anomalies
+        
+        anomaly_cols = ['Year', 'Month', 'Registrations', 'Seasonal_median', 'Trailing_median', 'Score', 'Direction']
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Stored oldest month first; shown most recent first
+            vc_anomalies = sort_anomalies(
+                filter_extra(extras['vehicle_category_anomalies'], years=selected_years, categories=selected_categories)
+            )
+            st.metric("Flagged Category Months", f"{len(vc_anomalies):,}")
+            if not vc_anomalies.empty:
+                st.dataframe(
+                    vc_anomalies[['Group', 'Vehicle Category'] + anomaly_cols],
+                    use_container_width=True,
+                    hide_index=True
+                )
+        
+        with col2:
+            maker_anomalies = sort_anomalies(filter_extra(extras['maker_anomalies'], years=selected_years, makers=selected_makers))
+            st.metric("Flagged Manufacturer Months", f"{len(maker_anomalies):,}")
+            if selected_makers and not maker_anomalies.empty:
+                st.dataframe(
+                    maker_anomalies[['Maker'] + anomaly_cols],
+                    use_container_width=True,
+                    hide_index=True
+                )
+    
     # Section 5: Summary Visualizations
     st.subheader(f"📊 Summary Visualizations - {vc_filtered['Year'].max()}")
     
@@ -374,39 +524,13 @@ def main():
     with col1:
         # Top performing vehicle categories
         if not vc_filtered.empty:
-            latest_year = vc_filtered['Year'].max()
-            latest_vc = vc_filtered[vc_filtered['Year'] == latest_year]
-            # Sort by registrations in descending order
-            latest_vc_sorted = latest_vc.sort_values('Registrations', ascending=False)
-            fig_top_vc = px.bar(
-                latest_vc_sorted,
-                x='Group',
-                y='Registrations',
-                title=f'{latest_year} Registrations by Vehicle Category',
-                color='Group',
-                text='Registrations',
-                color_discrete_map={'2W': '#1f77b4', '3W': '#ff7f0e', '4W': '#2ca02c'}
-            )
-            fig_top_vc.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-            fig_top_vc.update_layout(height=400)
+            fig_top_vc = latest_vc_figure(vc_filtered)
             st.plotly_chart(fig_top_vc, use_container_width=True)
     
     with col2:
         # Top performing manufacturers
         if not maker_filtered.empty:
-            latest_year = maker_filtered['Year'].max()
-            latest_maker = maker_filtered[maker_filtered['Year'] == latest_year]
-            top_10_makers = latest_maker.nlargest(10, 'Registrations')
-            fig_top_makers = px.bar(
-                top_10_makers,
-                x='Registrations',
-                y='Maker',
-                orientation='h',
-                title=f'Top 10 Manufacturers ({latest_year})',
-                color='Registrations',
-                color_continuous_scale='Blues'
-            )
-            fig_top_makers.update_layout(height=400)
+            fig_top_makers = latest_top_makers_figure(maker_filtered)
             st.plotly_chart(fig_top_makers, use_container_width=True)
     
     # Section 6: Data Tables (Collapsible)
@@ -428,20 +552,17 @@ def main():
             )
         
         with tab3:
-            if 'vc_qoq_filtered' in locals() and not vc_qoq_filtered.empty:
+            if not vc_qoq_filtered.empty:
                 st.dataframe(
-                    vc_qoq_filtered.sort_values(['Group', 'Year_Quarter']),
+                    vc_qoq_filtered.sort_values(['Group', 'Quarter_Key']),
                     use_container_width=True,
                     hide_index=True
                 )
         
         with tab4:
             if selected_makers and not maker_qoq_data.empty:
-                maker_qoq_filtered = maker_qoq_data[maker_qoq_data['Maker'].isin(selected_makers)]
-                if selected_years:
-                    maker_qoq_filtered = maker_qoq_filtered[maker_qoq_filtered['Year'].isin(selected_years)]
                 st.dataframe(
-                    maker_qoq_filtered.sort_values(['Maker', 'Year_Quarter']),
+                    maker_qoq_filtered.sort_values(['Maker', 'Quarter_Key']),
                     use_container_width=True,
                     hide_index=True
                 )
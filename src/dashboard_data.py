@@ -0,0 +1,183 @@
+import os
+import pandas as pd
+from snapshot import EXTRA_FILES, SOURCE_FILES, YTD_CUBE_FILES, default_processed_dir, load_snapshot, write_snapshot
+
+# The frames the dashboard loads are shared by every session through zero-copy views (see
+# session_views), which is only safe under copy-on-write. It is set once, here, so it is on
+# before any frame is read or unpickled, whichever module imports this one first.
+pd.set_option("mode.copy_on_write", True)
+
+
+def read_processed_data(processed_dir):
+    """Read the processed YoY/QoQ files the dashboard is built from."""
+    # Load yearly data
+    vc_data = pd.read_csv(os.path.join(processed_dir, "vehicle_category_group_yoy.csv"))
+    maker_data = pd.read_csv(os.path.join(processed_dir, "maker_yoy.csv"))
+
+    # Load quarterly data
+    vc_qoq_data = pd.read_csv(os.path.join(processed_dir, "vehicle_category_quarterly_qoq.csv"))
+    maker_qoq_data = pd.read_csv(os.path.join(processed_dir, "maker_quarterly_qoq.csv"))
+
+    # Convert empty strings back to NaN for calculations
+    vc_data["YoY_pct"] = pd.to_numeric(vc_data["YoY_pct"], errors="coerce")
+    maker_data["YoY_pct"] = pd.to_numeric(maker_data["YoY_pct"], errors="coerce")
+    vc_qoq_data["QoQ_pct"] = pd.to_numeric(vc_qoq_data["QoQ_pct"], errors="coerce")
+    maker_qoq_data["QoQ_pct"] = pd.to_numeric(maker_qoq_data["QoQ_pct"], errors="coerce")
+
+    # A partial latest year is compared with the same months of the previous year, not its full total
+    for df, name, id_col in ((vc_data, "vc", "Group"), (maker_data, "maker", "Maker_ID")):
+        cube_path = os.path.join(processed_dir, YTD_CUBE_FILES[name])
+        apply_ytd_yoy(df, pd.read_csv(cube_path) if os.path.exists(cube_path) else None, id_col)
+
+    return vc_data, maker_data, vc_qoq_data, maker_qoq_data
+
+
+def latest_ytd_growth(cube, id_col):
+    """
+    (year, through month, YTD YoY per entity) at the latest year's last complete cutoff from a
+    YTD cube, or None when that year is complete.
+    """
+    latest = cube[(cube["Year"] == cube["Year"].max()) & ~cube["Partial_Month"]]
+    if latest.empty or latest["Cutoff_Month"].max() == 12:
+        return None
+    at_cutoff = latest[latest["Cutoff_Month"] == latest["Cutoff_Month"].max()]
+    ytd_yoy = at_cutoff.groupby(id_col)["YTD_YoY_pct"].first()
+    return int(at_cutoff["Year"].iloc[0]), at_cutoff["Through_Month"].iloc[0], ytd_yoy
+
+
+def apply_ytd_yoy(yearly, cube, id_col):
+    """
+    Add Comparable_YoY_pct, in place: YoY_pct as written by the pipeline, except for a partial
+    latest year, which takes the cube's like-for-like YTD growth. YoY_basis labels each row's
+    comparison; YoY_pct itself is left as it is on disk.
+    """
+    yearly["Comparable_YoY_pct"] = yearly["YoY_pct"]
+    yearly["YoY_basis"] = "Full year"
+    growth = latest_ytd_growth(cube, id_col) if cube is not None and not cube.empty else None
+    if growth is None:
+        return yearly
+    year, through, ytd_yoy = growth
+    partial = yearly["Year"] == year
+    yearly.loc[partial, "Comparable_YoY_pct"] = yearly.loc[partial, id_col].map(ytd_yoy)
+    yearly.loc[partial, "YoY_basis"] = f"YTD JAN-{through}"
+    return yearly
+
+
+def yoy_caption(row):
+    """A row's YoY growth for display, noting when it is a year-to-date comparison."""
+    basis = row.get("YoY_basis", "Full year")
+    return f"{row['Comparable_YoY_pct']:.1f}% YoY" + ("" if basis == "Full year" else f", {basis}")
+
+
+def read_extra_data(processed_dir):
+    """Read whichever precomputed extra tables (shares, concentration, ...) the pipelines have produced."""
+    extras = {}
+    for name, filename in EXTRA_FILES.items():
+        path = os.path.join(processed_dir, filename)
+        if os.path.exists(path):
+            extras[name] = pd.read_csv(path)
+    return extras
+
+
+def top_maker_ids(maker_data, n=20):
+    """Maker IDs ordered by total registrations across all years."""
+    return maker_data.groupby("Maker_ID")["Registrations"].sum().sort_values(ascending=False).head(n).index.tolist()
+
+
+def sidebar_options(vc_data, maker_data, top_n=20):
+    """Option lists for the dashboard sidebar, precomputed so reruns skip the groupbys."""
+    top_makers = top_maker_ids(maker_data, n=top_n)
+    maker_names = maker_data.groupby("Maker_ID")["Maker"].first()
+    return {
+        "years": sorted(vc_data["Year"].unique().tolist()),
+        "categories": sorted(vc_data["Group"].unique().tolist()),
+        "top_makers": top_makers,
+        "maker_names": {maker_id: maker_names[maker_id] for maker_id in top_makers},
+    }
+
+
+def build_snapshot(processed_dir):
+    """Write the dashboard startup snapshot; skipped (None) until every processed file exists."""
+    if not all(os.path.exists(os.path.join(processed_dir, name)) for name in SOURCE_FILES):
+        return None
+    frames = read_processed_data(processed_dir)
+    return write_snapshot(processed_dir, frames, read_extra_data(processed_dir), sidebar_options(frames[0], frames[1]))
+
+
+def load_dashboard_data(processed_dir):
+    """Frames, extra tables and sidebar options from the snapshot, falling back to the processed CSVs."""
+    snapshot = load_snapshot(processed_dir)
+    if snapshot is not None:
+        return snapshot["frames"], snapshot["extras"], snapshot["options"]
+    frames = read_processed_data(processed_dir)
+    return frames, read_extra_data(processed_dir), sidebar_options(frames[0], frames[1])
+
+
+def load_sidebar_options(processed_dir):
+    snapshot = load_snapshot(processed_dir, with_frames=False)
+    if snapshot is not None:
+        return snapshot["options"]
+    return load_dashboard_data(processed_dir)[2]
+
+
+def session_views(frames, extras):
+    """
+    Per-session views of the frames and extra tables shared across sessions, without copying any data.
+
+    Copy-on-write (enabled at import) makes a write through a view copy only the touched
+    column, and `.values` of a view is read-only, so no session can change the shared frames.
+    """
+    return tuple(df.copy(deep=False) for df in frames), {name: df.copy(deep=False) for name, df in extras.items()}
+
+
+def filter_extra(df, years=None, makers=None, categories=None):
+    """Apply the year/maker/category filters to an extra table that has those columns."""
+    if years and "Year" in df.columns:
+        df = df[df["Year"].isin(years)]
+    if categories and "Group" in df.columns:
+        df = df[df["Group"].isin(categories)]
+    if makers and "Maker_ID" in df.columns:
+        df = df[df["Maker_ID"].isin(makers)]
+    return df
+
+
+def filter_data(vc_data, maker_data, vc_qoq_data, maker_qoq_data, years=None, categories=None, makers=None):
+    """Apply the dashboard filters; empty selections leave that dimension unfiltered."""
+    if years:
+        vc_filtered = vc_data[vc_data["Year"].isin(years)]
+        maker_filtered = maker_data[maker_data["Year"].isin(years)]
+        vc_qoq_filtered = vc_qoq_data[vc_qoq_data["Year"].isin(years)]
+    else:
+        vc_filtered = vc_data
+        maker_filtered = maker_data
+        vc_qoq_filtered = vc_qoq_data
+
+    if categories:
+        vc_filtered = vc_filtered[vc_filtered["Group"].isin(categories)]
+        vc_qoq_filtered = vc_qoq_filtered[vc_qoq_filtered["Group"].isin(categories)]
+
+    if makers:
+        maker_filtered = maker_filtered[maker_filtered["Maker_ID"].isin(makers)]
+        maker_qoq_filtered = maker_qoq_data[maker_qoq_data["Maker_ID"].isin(makers)]
+        if years:
+            maker_qoq_filtered = maker_qoq_filtered[maker_qoq_filtered["Year"].isin(years)]
+    else:
+        maker_qoq_filtered = maker_qoq_data.iloc[0:0]
+
+    return {
+        "vc": vc_filtered,
+        "maker": maker_filtered,
+        "vc_qoq": vc_qoq_filtered,
+        "maker_qoq": maker_qoq_filtered,
+    }
+
+
+def latest_performers(vc_filtered):
+    """Best and worst YoY vehicle groups in the latest selected year, or (None, None)."""
+    if vc_filtered.empty:
+        return None, None
+    latest_data = vc_filtered[vc_filtered["Year"] == vc_filtered["Year"].max()]
+    if latest_data.empty or latest_data["Comparable_YoY_pct"].isna().all():
+        return None, None
+    growth = latest_data["Comparable_YoY_pct"]
+    return latest_data.loc[growth.idxmax()], latest_data.loc[growth.idxmin()]
@@ -1,7 +1,17 @@
 import os
+import re
 import pandas as pd
 
 
+def monthly_file_years(monthly_data_dir, kind, extension="csv"):
+    """Years that have a `<year>_monthly_<kind>.<extension>` file in the monthly data folder, in order."""
+    pattern = re.compile(rf"(\d{{4}})_monthly_{kind}\.{extension}")
+    if not os.path.isdir(monthly_data_dir):
+        return []
+    matches = (pattern.fullmatch(name) for name in os.listdir(monthly_data_dir))
+    return sorted(int(match.group(1)) for match in matches if match)
+
+
 def clean_numeric_columns(df, columns):
     """
     Remove commas and non-digit characters from numbers and convert to nullable integers.
@@ -1,6 +1,9 @@
 import pandas as pd
 import os
 from data_cleaning import load_and_clean_vehicle_category_csv, load_and_clean_maker_csv
+from maker_canonicalization import canonicalize_makers
+from dashboard_data import build_snapshot, default_processed_dir
+from market_metrics import compute_market_share, compute_concentration, compute_rank_movement, top_movers
 
 
 def melt_years(df: pd.DataFrame, id_cols: list, value_name: str) -> pd.DataFrame:
@@ -73,7 +76,8 @@ def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-def run_pipeline(data_dir: str) -> dict:
+def run_pipeline(data_dir: str, processed_dir: str = None) -> dict:
+    processed_dir = processed_dir or os.path.join(data_dir, "processed")
     vc_path = os.path.join(data_dir, "yearly", "2021-2025_VCLASS.csv")
     maker_path = os.path.join(data_dir, "yearly", "2021-2025_MAKER.csv")
 
@@ -85,33 +89,58 @@ def run_pipeline(data_dir: str) -> dict:
     vc_group_long = compute_yoy(vc_group_long, group_col="Group", value_col="Registrations")
     vc_group_long = clean_final_data(vc_group_long)
 
-    # Maker long with YoY
-    maker_long = melt_years(maker_df[["Maker", "2025", "2024", "2023", "2022", "2021"]], ["Maker"], "Registrations")
-    maker_long = compute_yoy(maker_long, group_col="Maker", value_col="Registrations")
+    # Maker long with YoY, keyed on stable maker IDs so name variants collapse into one maker
+    year_cols = ["2025", "2024", "2023", "2022", "2021"]
+    maker_df = canonicalize_makers(maker_df, os.path.join(processed_dir, "maker_dictionary.csv"))
+    maker_df = maker_df.groupby(["Maker_ID", "Maker"], as_index=False)[year_cols].sum(min_count=1)
+    maker_long = melt_years(maker_df, ["Maker_ID", "Maker"], "Registrations")
+    maker_long = compute_yoy(maker_long, group_col="Maker_ID", value_col="Registrations")
     maker_long = clean_final_data(maker_long)
 
+    # Market share per maker and concentration of the maker market per year
+    maker_share = compute_market_share(maker_long[["Maker_ID", "Maker", "Year", "Registrations"]], period_col="Year")
+    maker_concentration = compute_concentration(maker_share, period_col="Year")
+
+    # Maker ranks per year and the biggest rank movers year over year
+    maker_ranks = compute_rank_movement(maker_long[["Maker_ID", "Maker", "Year", "Registrations"]], period_col="Year",
+                                        lags={"YoY": 1})
+    maker_movers = top_movers(maker_ranks, period_col="Year", comparisons=["YoY"])
+
     # Save processed outputs
-    processed_dir = os.path.join(data_dir, "processed")
     ensure_dir(processed_dir)
     vc_group_path = os.path.join(processed_dir, "vehicle_category_group_yoy.csv")
     maker_yoy_path = os.path.join(processed_dir, "maker_yoy.csv")
+    maker_share_path = os.path.join(processed_dir, "maker_share_yearly.csv")
+    maker_concentration_path = os.path.join(processed_dir, "maker_concentration_yearly.csv")
+    maker_ranks_path = os.path.join(processed_dir, "maker_ranks_yearly.csv")
+    maker_movers_path = os.path.join(processed_dir, "maker_movers_yearly.csv")
     vc_group_long.to_csv(vc_group_path, index=False)
     maker_long.to_csv(maker_yoy_path, index=False)
+    maker_share.to_csv(maker_share_path, index=False)
+    maker_concentration.to_csv(maker_concentration_path, index=False)
+    maker_ranks.to_csv(maker_ranks_path, index=False)
+    maker_movers.to_csv(maker_movers_path, index=False)
 
     return {
         "vc_group_long": vc_group_long,
         "maker_long": maker_long,
+        "maker_concentration": maker_concentration,
         "vc_path": vc_group_path,
         "maker_path": maker_yoy_path,
+        "maker_share_path": maker_share_path,
+        "maker_concentration_path": maker_concentration_path,
+        "maker_ranks_path": maker_ranks_path,
+        "maker_movers_path": maker_movers_path,
     }
 
 
 def main():
     project_root = os.path.dirname(os.path.dirname(__file__))
     data_dir = os.path.join(project_root, "data")
+    processed_dir = default_processed_dir()
 
     print("Running pipeline...")
-    outputs = run_pipeline(data_dir)
+    outputs = run_pipeline(data_dir, processed_dir)
 
     print("\nVehicle category group YoY (head):")
     print(outputs["vc_group_long"].head())
@@ -119,9 +148,20 @@ def main():
     print("\nMaker YoY (head):")
     print(outputs["maker_long"].head())
 
+    print("\nMaker market concentration by year:")
+    print(outputs["maker_concentration"])
+
     print("\nSaved processed files:")
     print(outputs["vc_path"])
     print(outputs["maker_path"])
+    print(outputs["maker_share_path"])
+    print(outputs["maker_concentration_path"])
+    print(outputs["maker_ranks_path"])
+    print(outputs["maker_movers_path"])
+
+    snapshot_path = build_snapshot(processed_dir)
+    if snapshot_path:
+        print(snapshot_path)
 
 
 if __name__ == "__main__":
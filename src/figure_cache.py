@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+
+from snapshot import tracked_files
+
+# Serialized figure JSON for dashboard views, cached on disk and keyed by the view, its filter
+# params, the processed data's modification time and the figure code, so a pipeline run or a
+# deploy that changes how figures are drawn invalidates every entry.
+
+CACHE_DIRNAME = "figure_cache"
+MAX_CACHED_FIGURES = 256
+
+# Modules the cached figures are built by
+FIGURE_MODULES = ["figures.py", "time_buckets.py"]
+
+
+def _figure_code_version():
+    digest = hashlib.sha1()
+    for name in FIGURE_MODULES:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+FIGURE_CODE_VERSION = _figure_code_version()
+
+
+def default_cache_dir(processed_dir):
+    return os.path.join(processed_dir, CACHE_DIRNAME)
+
+
+def data_version(processed_dir):
+    """Latest modification time (ns) of the processed files the dashboard reads."""
+    versions = [0]
+    for name in tracked_files():
+        path = os.path.join(processed_dir, name)
+        if os.path.exists(path):
+            versions.append(os.stat(path).st_mtime_ns)
+    return max(versions)
+
+
+def cache_key(view, params, version):
+    payload = json.dumps(
+        {"view": view, "params": params, "version": version, "code": FIGURE_CODE_VERSION}, sort_keys=True, default=str
+    )
+    return f"{view}-{hashlib.sha1(payload.encode()).hexdigest()[:16]}"
+
+
+def _prune(cache_dir, keep=MAX_CACHED_FIGURES):
+    """Drop the least recently written entries beyond `keep`."""
+    entries = [entry for entry in os.scandir(cache_dir) if entry.name.endswith(".json")]
+    if len(entries) <= keep:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+    for entry in entries[:len(entries) - keep]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def cached_figure(processed_dir, view, params, build, version=None):
+    """
+    Figure dict for a view from the on-disk cache; on a miss `build()` (returning a plotly
+    figure) is called and its JSON stored. `st.plotly_chart` accepts the dict directly.
+
+    `version` is the data version the caller's frames were loaded at (default: the files'
+    current one), so figures built from served data are never stored under the key of
+    outputs a running refresh has just rewritten.
+    """
+    cache_dir = default_cache_dir(processed_dir)
+    version = data_version(processed_dir) if version is None else version
+    path = os.path.join(cache_dir, cache_key(view, params, version) + ".json")
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    figure_json = build().to_json()
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(figure_json)
+    os.replace(tmp_path, path)
+    _prune(cache_dir)
+    return json.loads(figure_json)
@@ -0,0 +1,211 @@
+import pandas as pd
+import plotly.express as px
+from time_buckets import compute_growth
+
+
+GROUP_COLORS = {"2W": "#1f77b4", "3W": "#ff7f0e", "4W": "#2ca02c"}
+
+# Per-maker charts keep their payload bounded: makers beyond the top TOP_K_TRACES are summed
+# into one "Others" trace and lines are drawn with WebGL.
+TOP_K_TRACES = 8
+OTHERS_MAKER_ID = -1
+
+
+def rollup_others(df, period_cols, value_cols, top_k=TOP_K_TRACES, entity_col="Maker_ID", label_col="Maker"):
+    """
+    Keep the `top_k` entities with the largest total of the first value column and sum the
+    rest into a single "Others" entity per period.
+    """
+    totals = df.groupby(entity_col)[value_cols[0]].sum()
+    if len(totals) <= top_k:
+        return df
+    is_top = df[entity_col].isin(totals.nlargest(top_k).index)
+    others = df[~is_top].groupby(period_cols, as_index=False)[value_cols].sum(min_count=1)
+    others[entity_col] = OTHERS_MAKER_ID
+    others[label_col] = f"Others ({len(totals) - top_k})"
+    return pd.concat([df[is_top], others], ignore_index=True)
+
+
+def vc_trend_figure(vc_filtered):
+    fig = px.line(
+        vc_filtered,
+        x="Year",
+        y="Registrations",
+        color="Group",
+        title="Vehicle Registration Trends Over Time",
+        labels={"Registrations": "Total Registrations", "Year": "Year"},
+        markers=True,
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+def yoy_growth_figure(vc_filtered):
+    title = "Year-over-Year [YoY] Growth by Vehicle Category"
+    # Partial years are compared year-to-date (see dashboard_data.apply_ytd_yoy)
+    ytd_years = vc_filtered[vc_filtered["YoY_basis"] != "Full year"] if "YoY_basis" in vc_filtered.columns else vc_filtered.iloc[0:0]
+    if not ytd_years.empty:
+        title += f"<br><sup>{ytd_years['Year'].iloc[0]}: {ytd_years['YoY_basis'].iloc[0]} vs the same months a year earlier</sup>"
+    fig = px.bar(
+        vc_filtered,
+        x="Year",
+        y="Comparable_YoY_pct",
+        color="Group",
+        title=title,
+        barmode="group",
+        labels={"Comparable_YoY_pct": "YoY Growth (%)", "Year": "Year", "YoY_basis": "Basis"},
+        hover_data=["YoY_basis"] if "YoY_basis" in vc_filtered.columns else None,
+        color_discrete_map=GROUP_COLORS,
+    )
+    fig.update_layout(height=400, xaxis_tickangle=0)
+    fig.update_traces(texttemplate="%{y:.1f}%", textposition="outside")
+    return fig
+
+
+def qoq_growth_figure(vc_qoq_filtered):
+    fig = px.line(
+        vc_qoq_filtered,
+        x="Year_Quarter",
+        y="QoQ_pct",
+        color="Group",
+        title="Quarter-over-Quarter [QoQ] Growth Trends",
+        labels={"QoQ_pct": "QoQ Growth (%)", "Year_Quarter": "Year-Quarter"},
+        markers=True,
+        color_discrete_map=GROUP_COLORS,
+        render_mode="webgl",
+    )
+    fig.update_layout(height=400, xaxis_tickangle=-45)
+    fig.update_traces(mode="lines+markers", marker_size=8)
+    return fig
+
+
+def ytd_growth_figure(ytd_cube):
+    """Like-for-like YTD growth of each vehicle group through every cutoff month of one year."""
+    year = ytd_cube["Year"].max()
+    fig = px.line(
+        ytd_cube,
+        x="Through_Month",
+        y="YTD_YoY_pct",
+        color="Group",
+        title=f"{year} Year-to-Date Growth vs Same Months of {year - 1}",
+        labels={"YTD_YoY_pct": "YTD YoY Growth (%)", "Through_Month": "Through"},
+        markers=True,
+        color_discrete_map=GROUP_COLORS,
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+def top_makers_figure(maker_filtered):
+    top_makers_summary = maker_filtered.groupby("Maker")["Registrations"].sum().sort_values(ascending=False).head(10)
+    fig = px.bar(
+        x=top_makers_summary.values,
+        y=top_makers_summary.index,
+        orientation="h",
+        title="Top 10 Manufacturers by Total Registrations",
+        labels={"x": "Total Registrations", "y": "Manufacturer"},
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+def maker_trends_figure(maker_filtered, top_k=TOP_K_TRACES):
+    trends = rollup_others(maker_filtered, ["Year"], ["Registrations"], top_k)
+    fig = px.line(
+        trends,
+        x="Year",
+        y="Registrations",
+        color="Maker",
+        title="Manufacturer Registration Trends",
+        labels={"Registrations": "Total Registrations", "Year": "Year"},
+        render_mode="webgl",
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+def maker_qoq_figure(maker_qoq_filtered, top_k=TOP_K_TRACES):
+    quarterly = rollup_others(maker_qoq_filtered, ["Quarter_Key", "Year_Quarter", "Months"], ["Registrations"], top_k)
+    # A summed QoQ_pct is meaningless, so the Others trace gets its growth from its summed registrations
+    is_others = quarterly["Maker_ID"] == OTHERS_MAKER_ID
+    if is_others.any():
+        others = compute_growth(quarterly[is_others], ["Maker_ID"], key_col="Quarter_Key", growth_col="QoQ_pct")
+        quarterly = pd.concat([quarterly[~is_others], others], ignore_index=True)
+    quarterly = quarterly.sort_values("Quarter_Key", kind="stable")
+    fig = px.line(
+        quarterly,
+        x="Year_Quarter",
+        y="QoQ_pct",
+        color="Maker",
+        title="Manufacturer Quarter-over-Quarter [QoQ] Growth",
+        labels={"QoQ_pct": "QoQ Growth (%)", "Year_Quarter": "Year-Quarter"},
+        markers=True,
+        render_mode="webgl",
+    )
+    fig.update_layout(height=400, xaxis_tickangle=-45)
+    return fig
+
+
+def market_share_figure(share_filtered, top_k=TOP_K_TRACES):
+    shares = rollup_others(share_filtered, ["Quarter_Key", "Year_Quarter"], ["Registrations", "Share_pct"], top_k)
+    fig = px.line(
+        shares.sort_values("Quarter_Key", kind="stable"),
+        x="Year_Quarter",
+        y="Share_pct",
+        color="Maker",
+        title="Market Share of Selected Manufacturers",
+        labels={"Share_pct": "Share of Registrations (%)", "Year_Quarter": "Year-Quarter"},
+        markers=True,
+        render_mode="webgl",
+    )
+    fig.update_layout(height=400, xaxis_tickangle=-45)
+    return fig
+
+
+def concentration_figure(concentration, x="Year_Quarter"):
+    fig = px.line(
+        concentration,
+        x=x,
+        y=["HHI"],
+        title="Market Concentration (HHI)",
+        labels={"value": "HHI (0-10,000)", "Year_Quarter": "Year-Quarter", "variable": ""},
+        markers=True,
+    )
+    fig.update_layout(height=400, xaxis_tickangle=-45, showlegend=False)
+    return fig
+
+
+def latest_vc_figure(vc_filtered):
+    latest_year = vc_filtered["Year"].max()
+    latest_vc = vc_filtered[vc_filtered["Year"] == latest_year]
+    # Sort by registrations in descending order
+    latest_vc_sorted = latest_vc.sort_values("Registrations", ascending=False)
+    fig = px.bar(
+        latest_vc_sorted,
+        x="Group",
+        y="Registrations",
+        title=f"{latest_year} Registrations by Vehicle Category",
+        color="Group",
+        text="Registrations",
+        color_discrete_map=GROUP_COLORS,
+    )
+    fig.update_traces(texttemplate="%{text:,.0f}", textposition="outside")
+    fig.update_layout(height=400)
+    return fig
+
+
+def latest_top_makers_figure(maker_filtered):
+    latest_year = maker_filtered["Year"].max()
+    latest_maker = maker_filtered[maker_filtered["Year"] == latest_year]
+    top_10_makers = latest_maker.nlargest(10, "Registrations")
+    fig = px.bar(
+        top_10_makers,
+        x="Registrations",
+        y="Maker",
+        orientation="h",
+        title=f"Top 10 Manufacturers ({latest_year})",
+        color="Registrations",
+        color_continuous_scale="Blues",
+    )
+    fig.update_layout(height=400)
+    return fig
@@ -0,0 +1,394 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from anomaly_detection import TRAILING_MONTHS, score_anomalies, sort_anomalies
+from dashboard_data import build_snapshot, default_processed_dir
+from monthly_data_processing import (
+    add_ytd_yoy,
+    flag_partial_month,
+    load_monthly_csv,
+    maker_monthly_rows,
+    process_monthly_data,
+    quarterly_layout,
+    quarterly_market_metrics,
+    quarterly_rank_movement,
+    sort_periods,
+    sort_ytd,
+    vc_monthly_rows,
+)
+from pipeline_state import file_state, is_unchanged, load_state, months_digest, save_state
+from time_buckets import MONTHS, aggregate_buckets, compute_growth
+
+
+# When the current-year monthly files gain a month, only the periods containing that month
+# change: its quarter, half-year, year and fiscal buckets, the current quarter's shares,
+# concentration and ranks, the YTD cube's new cutoffs and the anomaly scores of the new month.
+# This mode patches exactly those rows of the processed outputs. The outputs are stored period
+# first, so the patched rows sit at the end of each file and only that tail is rewritten; the
+# files are still read in full. Anything else (revised history, a removed file, no saved state)
+# falls back to a full rebuild.
+
+MONTHLY_FILE_PATTERN = re.compile(r"(\d{4})_monthly_(VC|MAKER)\.csv")
+
+DOMAINS = {
+    "VC": {
+        "name_col": "Vehicle Category",
+        "id_cols": ["Group"],
+        "anomaly_cols": ["Group", "Vehicle Category"],
+        "prefix": "vehicle_category",
+    },
+    "MAKER": {
+        "name_col": "Maker",
+        "id_cols": ["Maker_ID", "Maker"],
+        "anomaly_cols": ["Maker_ID", "Maker"],
+        "prefix": "maker",
+    },
+}
+
+
+def find_appended_months(monthly_data_dir, state):
+    """
+    Monthly files that only gained trailing months since the saved state, as
+    {filename: (kind, year, df, new_month_cols)}, or None when history changed.
+    """
+    files = state["files"]
+    present = {name for name in os.listdir(monthly_data_dir) if MONTHLY_FILE_PATTERN.fullmatch(name)}
+    if not set(files) <= present:
+        return None
+
+    last_year = {}
+    for name in files:
+        year, kind = MONTHLY_FILE_PATTERN.fullmatch(name).groups()
+        last_year[kind] = max(last_year.get(kind, 0), int(year))
+
+    appended = {}
+    for name in sorted(present):
+        path = os.path.join(monthly_data_dir, name)
+        if name in files and is_unchanged(files[name], path):
+            continue
+        year, kind = MONTHLY_FILE_PATTERN.fullmatch(name).groups()
+        year = int(year)
+        df = load_monthly_csv(path)
+        month_cols = [col for col in df.columns if col in MONTHS]
+
+        if name in files:
+            # Already processed months must be unchanged; only the latest year may gain months
+            old_months = files[name]["months"]
+            if month_cols[:len(old_months)] != old_months:
+                return None
+            if months_digest(df, DOMAINS[kind]["name_col"], old_months) != files[name]["digest"]:
+                return None
+            new_months = month_cols[len(old_months):]
+            if new_months and year != last_year[kind]:
+                return None
+        else:
+            # A new year's file may only follow the latest processed year
+            if year != last_year.get(kind, year - 1) + 1:
+                return None
+            new_months = month_cols
+
+        appended[name] = (kind, year, df, new_months)
+    return appended
+
+
+def monthly_rows(kind, df, year, dictionary_path):
+    if kind == "MAKER":
+        return maker_monthly_rows(df, year, dictionary_path)
+    return vc_monthly_rows(df, year)
+
+
+def read_months(monthly_data_dir, kind, month_keys, dictionary_path):
+    """Long monthly rows of a domain for just the given month keys, read like the full rebuild reads them."""
+    rows = []
+    for year in sorted({key // 12 for key in month_keys}):
+        path = os.path.join(monthly_data_dir, f"{year}_monthly_{kind}.csv")
+        if not os.path.exists(path):
+            continue
+        name_col = DOMAINS[kind]["name_col"]
+        wanted = {MONTHS[key % 12] for key in month_keys if key // 12 == year}
+        df = load_monthly_csv(path)
+        df = df[[name_col] + [col for col in df.columns if col in wanted]]
+        if len(df.columns) > 1:
+            rows.append(monthly_rows(kind, df, year, dictionary_path))
+    return pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
+
+
+def _replace_rows(existing, patched, key_cols, sort_cols=None):
+    """
+    `existing` with every row whose `key_cols` appear in `patched` replaced by the patched rows,
+    sorted on `sort_cols` when given.
+    """
+    keys = patched[key_cols].drop_duplicates()
+    stale = existing[key_cols].merge(keys, how="left", indicator=True)["_merge"].eq("both").to_numpy()
+    combined = pd.concat([existing[~stale], patched[existing.columns]], ignore_index=True)
+    if sort_cols is None:
+        return combined
+    return combined.sort_values(sort_cols, kind="stable").reset_index(drop=True)
+
+
+def unchanged_prefix(old, new):
+    """Number of leading rows `new` shares with `old` (NaN equal to NaN), or 0 when their columns differ."""
+    if list(old.columns) != list(new.columns):
+        return 0
+    rows = min(len(old), len(new))
+    same = np.ones(rows, dtype=bool)
+    for col in old.columns:
+        old_values, new_values = old[col].to_numpy()[:rows], new[col].to_numpy()[:rows]
+        same &= (old_values == new_values) | (pd.isna(old_values) & pd.isna(new_values))
+    return rows if same.all() else int(np.argmin(same))
+
+
+def write_patched(path, old, new):
+    """
+    Write `new` to the CSV at `path`, which holds `old`: the rows the two share at the start are
+    left in place and only the rest of the file is truncated and rewritten. The processed files
+    never hold line breaks inside a field, so each row is one line.
+    """
+    keep = unchanged_prefix(old, new)
+    if keep == 0:
+        new.to_csv(path, index=False)
+        return
+    with open(path, "r+b") as f:
+        header = f.readline()
+        line_terminator = "\r\n" if header.endswith(b"\r\n") else "\n"
+        for _ in range(keep):
+            f.readline()
+        f.seek(f.tell())
+        f.truncate()
+        f.write(new.iloc[keep:].to_csv(index=False, header=False, lineterminator=line_terminator).encode("utf-8"))
+
+
+def patch_periods(periods, new_rows, id_cols):
+    """
+    Add the new months to every bucket that contains them and recompute those buckets' growth.
+    Returns (patched periods table, patched rows).
+    """
+    delta = pd.concat(
+        [bucket_df.assign(Bucket=name) for name, bucket_df in aggregate_buckets(new_rows, id_cols).items()],
+        ignore_index=True
+    )
+    bucket_cols = ["Bucket", "Period_Key"]
+    entity_cols = ["Bucket"] + id_cols + ["Period_Key"]
+    affected = delta[bucket_cols].drop_duplicates()
+    is_affected = periods[bucket_cols].merge(affected, how="left", indicator=True)["_merge"].eq("both").to_numpy()
+    old = periods[is_affected]
+
+    # Coverage is per bucket, not per entity: old months plus the newly added ones
+    months = (
+        old.groupby(bucket_cols)["Months"].max()
+        .add(delta.groupby(bucket_cols)["Months"].max(), fill_value=0)
+        .astype(int).rename("Months")
+    )
+    grouped = pd.concat([old, delta], ignore_index=True).groupby(entity_cols)
+    patched = pd.DataFrame({
+        "Period": grouped["Period"].first(),
+        "Registrations": grouped["Registrations"].sum(min_count=1),
+    }).reset_index()
+    patched = patched.merge(months.reset_index(), on=bucket_cols)
+
+    # Growth needs each patched row's previous period, taken from the untouched rows
+    previous_keys = affected.assign(Period_Key=affected["Period_Key"] - 1)
+    is_previous = periods[bucket_cols].merge(previous_keys, how="left", indicator=True)["_merge"].eq("both").to_numpy()
+    with_previous = compute_growth(
+        pd.concat([periods[is_previous & ~is_affected], patched], ignore_index=True), ["Bucket"] + id_cols
+    )
+    patched = with_previous.merge(affected, on=bucket_cols)[periods.columns]
+    return sort_periods(_replace_rows(periods, patched, entity_cols), id_cols), patched
+
+
+def patch_quarterly(quarterly, patched_periods, id_cols):
+    quarters = patched_periods[patched_periods["Bucket"] == "calendar_quarter"].rename(
+        columns={"Period_Key": "Quarter_Key", "Period": "Year_Quarter", "Growth_pct": "QoQ_pct"}
+    )
+    quarters = quarterly_layout(quarters, id_cols)
+    updated = _replace_rows(quarterly, quarters, ["Quarter_Key"], ["Quarter_Key"] + id_cols)
+    return updated, sorted(quarters["Quarter_Key"].unique())
+
+
+def patch_market_metrics(share, concentration, quarterly, quarter_keys):
+    """Recompute shares and concentration of the patched quarters, with their previous quarter for the changes."""
+    rows = quarterly[quarterly["Quarter_Key"].between(min(quarter_keys) - 1, max(quarter_keys))]
+    new_share, new_concentration = quarterly_market_metrics(rows)
+    new_share = new_share[new_share["Quarter_Key"].isin(quarter_keys)]
+    new_concentration = new_concentration[new_concentration["Quarter_Key"].isin(quarter_keys)]
+    return (
+        _replace_rows(share, new_share, ["Quarter_Key"], ["Quarter_Key", "Maker_ID"]),
+        _replace_rows(concentration, new_concentration, ["Quarter_Key"], ["Quarter_Key"]),
+    )
+
+
+def patch_rank_movement(ranks, movers, quarterly, quarter_keys):
+    """Re-rank the patched quarters, reading the previous quarter and the same quarter a year earlier for the changes."""
+    rows = quarterly[quarterly["Quarter_Key"].between(min(quarter_keys) - 4, max(quarter_keys))]
+    new_ranks, new_movers = quarterly_rank_movement(rows)
+    new_ranks = new_ranks[new_ranks["Quarter_Key"].isin(quarter_keys)]
+    new_movers = new_movers[new_movers["Quarter_Key"].isin(quarter_keys)]
+    return (
+        _replace_rows(ranks, new_ranks, ["Quarter_Key"], ["Quarter_Key", "Rank"]),
+        _replace_rows(movers, new_movers, ["Quarter_Key"], ["Quarter_Key", "Comparison", "Direction", "Position"]),
+    )
+
+
+def patch_ytd(ytd, new_rows, id_cols):
+    """
+    Append the new months' cutoffs to the YTD cube. Each cutoff adds its month to the entity's
+    previous cutoff, and the prior-year totals are the cube's own rows a year earlier.
+    """
+    for year, year_rows in new_rows.groupby(new_rows["Month_Key"] // 12):
+        def cutoff_totals(cube_year, cutoff):
+            rows = ytd[(ytd["Year"] == cube_year) & (ytd["Cutoff_Month"] == cutoff)]
+            return rows.set_index(id_cols)["YTD_Registrations"]
+
+        monthly = (
+            year_rows.assign(Cutoff_Month=year_rows["Month_Key"] % 12 + 1)
+            .groupby(id_cols + ["Cutoff_Month"])["Registrations"].sum(min_count=1)
+            .unstack("Cutoff_Month")
+        )
+        cutoffs = list(monthly.columns)
+        base = cutoff_totals(year, cutoffs[0] - 1)
+        priors = [cutoff_totals(year - 1, cutoff) for cutoff in cutoffs]
+        entities = monthly.index.union(base.index)
+        for prior in priors:
+            entities = entities.union(prior.index)
+
+        # Running totals from the previous cutoff, NaN until an entity has any data this year
+        stacked = np.hstack([
+            base.reindex(entities).to_numpy(dtype=float)[:, None],
+            monthly.reindex(entities).to_numpy(dtype=float),
+        ])
+        present = np.logical_or.accumulate(~np.isnan(stacked), axis=1)[:, 1:]
+        totals = np.where(present, np.nancumsum(stacked, axis=1)[:, 1:], np.nan)
+
+        patched = pd.concat([
+            entities.to_frame(index=False).assign(
+                Year=year, Cutoff_Month=cutoff, Through_Month=MONTHS[cutoff - 1],
+                YTD_Registrations=totals[:, index], Prior_YTD_Registrations=prior.reindex(entities).to_numpy(dtype=float)
+            )
+            for index, (cutoff, prior) in enumerate(zip(cutoffs, priors))
+        ], ignore_index=True)
+        patched = patched[patched["YTD_Registrations"].notna() | patched["Prior_YTD_Registrations"].notna()]
+        ytd = pd.concat([ytd, add_ytd_yoy(patched)], ignore_index=True)
+    return flag_partial_month(sort_ytd(ytd, id_cols))
+
+
+def patch_anomalies(anomalies, scoring_rows, anomaly_cols, new_keys):
+    """Score just the new months (against the history columns in `scoring_rows`) and swap in their flags."""
+    flags = score_anomalies(scoring_rows, anomaly_cols, month_keys=new_keys)
+    kept = anomalies[~anomalies["Month_Key"].isin(new_keys)]
+    return sort_anomalies(pd.concat([kept, flags[anomalies.columns]], ignore_index=True), recent_first=False)
+
+
+def update_domain(kind, appended_files, monthly_data_dir, processed_dir, dictionary_path, first_year):
+    """Patch one domain's outputs with its appended months; returns the paths written."""
+    domain = DOMAINS[kind]
+    id_cols, prefix = domain["id_cols"], domain["prefix"]
+    name_col = domain["name_col"]
+
+    new_rows = pd.concat([
+        monthly_rows(kind, df[[name_col] + new_months], year, dictionary_path)
+        for _, year, df, new_months in appended_files
+        if new_months
+    ], ignore_index=True)
+    new_keys = sorted(new_rows["Month_Key"].unique())
+    print(f"  {kind}: {len(new_keys)} new month(s): " + ", ".join(f"{MONTHS[key % 12]} {key // 12}" for key in new_keys))
+
+    def path(name):
+        return os.path.join(processed_dir, f"{prefix}_{name}.csv")
+
+    # The outputs as read, so that only the rows after their unchanged start are written back
+    existing = {}
+
+    def read(name):
+        existing[path(name)] = pd.read_csv(path(name))
+        return existing[path(name)]
+
+    outputs = {}
+    periods, patched = patch_periods(read("periods"), new_rows, id_cols)
+    outputs[path("periods")] = periods
+    quarterly, quarter_keys = patch_quarterly(read("quarterly_qoq"), patched, id_cols)
+    outputs[path("quarterly_qoq")] = quarterly
+
+    if kind == "MAKER":
+        share, concentration = patch_market_metrics(
+            read("share_quarterly"), read("concentration_quarterly"), quarterly, quarter_keys
+        )
+        outputs[path("share_quarterly")] = share
+        outputs[path("concentration_quarterly")] = concentration
+        ranks, movers = patch_rank_movement(read("ranks_quarterly"), read("movers_quarterly"), quarterly, quarter_keys)
+        outputs[path("ranks_quarterly")] = ranks
+        outputs[path("movers_quarterly")] = movers
+
+    outputs[path("ytd_cube")] = patch_ytd(read("ytd_cube"), new_rows, id_cols)
+
+    # Anomalies: each new month needs its trailing window and the same month in prior years
+    history_keys = {
+        key - lag for key in new_keys for lag in range(1, TRAILING_MONTHS + 1)
+    } | {
+        key - 12 * lag for key in new_keys for lag in range(1, key // 12 - first_year + 1)
+    }
+    history_rows = read_months(monthly_data_dir, kind, sorted(history_keys - set(new_keys)), dictionary_path)
+    outputs[path("anomalies")] = patch_anomalies(
+        read("anomalies"),
+        pd.concat([history_rows, new_rows], ignore_index=True),
+        domain["anomaly_cols"],
+        new_keys
+    )
+
+    for output_path, df in outputs.items():
+        write_patched(output_path, existing[output_path], df)
+        print(f"  Patched: {output_path}")
+    return list(outputs)
+
+
+def update_monthly_data(monthly_data_dir, processed_dir=None):
+    """Patch the monthly outputs with newly appended months, or rebuild them when that is not possible."""
+    processed_dir = processed_dir or os.path.join(os.path.dirname(monthly_data_dir), "processed")
+    dictionary_path = os.path.join(processed_dir, "maker_dictionary.csv")
+    state = load_state(processed_dir)
+    appended = find_appended_months(monthly_data_dir, state) if state is not None else None
+    if appended is None:
+        print("No usable pipeline state or history changed: running the full monthly rebuild...")
+        return list(process_monthly_data(monthly_data_dir, processed_dir).values())
+    paths = []
+    for kind in DOMAINS:
+        appended_files = [entry for entry in appended.values() if entry[0] == kind]
+        if any(new_months for _, _, _, new_months in appended_files):
+            first_year = min(
+                int(match.group(1)) for match in map(MONTHLY_FILE_PATTERN.fullmatch, state["files"])
+                if match.group(2) == kind
+            )
+            paths += update_domain(kind, appended_files, monthly_data_dir, processed_dir, dictionary_path, first_year)
+
+    if not paths:
+        print("No new months.")
+
+    # Refresh the state of every re-read file, including touched files without new months
+    files = dict(state["files"])
+    for name, (kind, _, df, _) in appended.items():
+        files[name] = file_state(df, DOMAINS[kind]["name_col"], os.path.join(monthly_data_dir, name))
+    if appended:
+        save_state(processed_dir, files)
+    return paths
+
+
+def main():
+    project_root = os.path.dirname(os.path.dirname(__file__))
+    monthly_data_dir = os.path.join(project_root, "data", "monthly")
+    processed_dir = default_processed_dir()
+
+    print("Updating monthly outputs incrementally...")
+    paths = update_monthly_data(monthly_data_dir, processed_dir)
+    snapshot_path = build_snapshot(processed_dir) if paths else None
+    if snapshot_path:
+        paths.append(snapshot_path)
+
+    print("\nUpdate complete!")
+    for path in paths:
+        print(f"  - {path}")
+
+
+if __name__ == "__main__":
+    main()
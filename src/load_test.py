@@ -0,0 +1,167 @@
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from tornado.websocket import websocket_connect
+
+
+# Drives a real `streamlit run` server over its websocket protocol, since AppTest instances
+# share a global runtime and cannot run concurrently in one process.
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(script_path, port):
+    """Start a headless dashboard server and wait for its health check."""
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", script_path,
+            "--server.headless", "true",
+            "--server.port", str(port),
+            "--server.fileWatcherType", "none",
+            "--browser.gatherUsageStats", "false",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("Dashboard server did not start")
+
+
+def rss_mb(pid):
+    """Resident set size of a process in MB (Linux /proc)."""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+async def _rerun(ws, widgets):
+    """Send one rerun with the given widget states; returns the multiselects the run rendered."""
+    msg = BackMsg()
+    msg.rerun_script.query_string = ""
+    msg.rerun_script.page_script_hash = ""
+    for widget_id, values in widgets.items():
+        state = msg.rerun_script.widget_states.widgets.add()
+        state.id = widget_id
+        state.string_array_value.data[:] = values
+    await ws.write_message(msg.SerializeToString(), binary=True)
+
+    multiselects = {}
+    while True:
+        payload = await ws.read_message()
+        if payload is None:
+            raise RuntimeError("Server closed the session")
+        forward = ForwardMsg()
+        forward.ParseFromString(payload)
+        kind = forward.WhichOneof("type")
+        if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+            element = forward.delta.new_element
+            if element.WhichOneof("type") == "multiselect":
+                multiselects[element.multiselect.label] = element.multiselect
+            elif element.WhichOneof("type") == "exception":
+                raise RuntimeError(f"Dashboard raised: {element.exception.message}")
+        elif kind == "script_finished" and forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+            return multiselects
+
+
+async def run_session(port, reruns, seed):
+    """One simulated user: open the dashboard, then change every filter `reruns` times."""
+    rng = random.Random(seed)
+    ws = await websocket_connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"])
+    multiselects = await _rerun(ws, {})
+
+    latencies = []
+    for _ in range(reruns):
+        widgets = {}
+        for label, proto in multiselects.items():
+            options = list(proto.options)
+            limit = len(options) if label != "Select Manufacturers:" else 8
+            widgets[proto.id] = rng.sample(options, rng.randint(1, min(limit, len(options))))
+        start = time.perf_counter()
+        multiselects = await _rerun(ws, widgets) or multiselects
+        latencies.append(time.perf_counter() - start)
+    ws.close()
+    return latencies
+
+
+async def _sample_rss(pid, peak, stop):
+    while not stop.is_set():
+        peak[0] = max(peak[0], rss_mb(pid))
+        await asyncio.sleep(0.05)
+
+
+async def _run_sessions(server, port, sessions, reruns):
+    peak = [rss_mb(server.pid)]
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_rss(server.pid, peak, stop))
+    results = await asyncio.gather(*(run_session(port, reruns, seed) for seed in range(sessions)))
+    stop.set()
+    await sampler
+    return results, peak[0]
+
+
+def run_load_test(script_path, sessions=8, reruns=10):
+    """Start the dashboard, run `sessions` concurrent sessions against it, and summarize latency and RSS."""
+    port = _free_port()
+    server = start_server(script_path, port)
+    try:
+        rss_idle = rss_mb(server.pid)
+        start = time.perf_counter()
+        results, rss_peak = asyncio.run(_run_sessions(server, port, sessions, reruns))
+        elapsed = time.perf_counter() - start
+        rss_after = rss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = sorted(latency for session in results for latency in session)
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "elapsed": elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[max(0, int(round(0.95 * len(latencies))) - 1)],
+        "rss_idle_mb": rss_idle,
+        "rss_peak_mb": rss_peak,
+        "rss_after_mb": rss_after,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard sessions changing filters.")
+    parser.add_argument("--script", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard.py"))
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--reruns", type=int, default=10, help="Filter changes per session")
+    args = parser.parse_args()
+
+    report = run_load_test(os.path.abspath(args.script), sessions=args.sessions, reruns=args.reruns)
+    print(f"{report['sessions']} concurrent sessions, {report['reruns']} reruns in {report['elapsed']:.1f}s")
+    print(f"  Rerun latency p50: {report['p50'] * 1000:.0f} ms")
+    print(f"  Rerun latency p95: {report['p95'] * 1000:.0f} ms")
+    print(f"  Server RSS idle: {report['rss_idle_mb']:.0f} MB, peak: {report['rss_peak_mb']:.0f} MB, after: {report['rss_after_mb']:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
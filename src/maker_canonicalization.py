@@ -0,0 +1,211 @@
+import os
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import pandas as pd
+from data_cleaning import load_and_clean_maker_csv, monthly_file_years
+
+
+DICTIONARY_COLUMNS = ["Maker_ID", "Maker", "Alias"]
+
+# Legal-form tokens that do not distinguish one manufacturer from another
+LEGAL_SUFFIXES = {"PVT", "LTD", "LLP", "CO", "INC", "CORP", "COMPANY", "CORPORATION", "INCORPORATED"}
+
+# Minimum similarity for two match keys in the same block to be treated as one maker
+FUZZY_THRESHOLD = 0.94
+
+
+def clean_maker_name(name):
+    """Strip stray quotes and whitespace from a raw maker name, e.g. '\"\"\"VOLVO GROUP INDIA PVT LTD\"\"\"'."""
+    name = str(name).strip().strip('"').strip()
+    return re.sub(r"\s+", " ", name).upper()
+
+
+def maker_match_key(name):
+    """Normalize a maker name into the key used for exact and fuzzy matching."""
+    key = clean_maker_name(name)
+    key = re.sub(r"^M\s*/\s*S\.?\s+", "", key)
+    key = key.replace("&", " AND ")
+    key = re.sub(r"[^A-Z0-9 ]", " ", key)
+    key = re.sub(r"\bPRIVATE\b", "PVT", key)
+    key = re.sub(r"\bLIMITED\b", "LTD", key)
+    tokens = key.split()
+    # Only trailing legal forms are dropped so "SPEEGO VEHICLES CO PVT LTD" == "SPEEGO VEHICLES PVT. LTD"
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def build_blocking_index(keys):
+    """Group match keys by their first token so fuzzy comparisons stay within small blocks."""
+    blocks = defaultdict(list)
+    for key in keys:
+        if key:
+            blocks[key.split(" ", 1)[0]].append(key)
+    return blocks
+
+
+def _tokens_compatible(a, b):
+    """Keys must align token by token; only longer alphabetic tokens may differ (typos, plurals)."""
+    tokens_a, tokens_b = a.split(), b.split()
+    if len(tokens_a) != len(tokens_b):
+        return False
+    for token_a, token_b in zip(tokens_a, tokens_b):
+        if token_a == token_b:
+            continue
+        if not (token_a.isalpha() and token_b.isalpha()) or min(len(token_a), len(token_b)) < 4:
+            return False
+        if SequenceMatcher(None, token_a, token_b).ratio() < 0.8:
+            return False
+    return True
+
+
+def _is_fuzzy_match(a, b):
+    """Similarity check for two keys of the same block; initials and numbers must agree exactly."""
+    if min(len(a), len(b)) / max(len(a), len(b)) < FUZZY_THRESHOLD:
+        return False
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    if matcher.quick_ratio() < FUZZY_THRESHOLD or matcher.ratio() < FUZZY_THRESHOLD:
+        return False
+    return _tokens_compatible(a, b)
+
+
+def resolve_key_clusters(keys):
+    """Map every match key to a representative key, merging fuzzy variants within each block."""
+    parent = {key: key for key in keys}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for block in build_blocking_index(keys).values():
+        block = sorted(block)
+        for i, a in enumerate(block):
+            for b in block[i + 1:]:
+                if _is_fuzzy_match(a, b):
+                    root_a, root_b = find(a), find(b)
+                    if root_a != root_b:
+                        parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    return {key: find(key) for key in keys}
+
+
+def load_maker_dictionary(path):
+    """Load the persisted maker dictionary (one row per alias), or an empty one."""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=DICTIONARY_COLUMNS).astype({"Maker_ID": int})
+    dictionary = pd.read_csv(path, keep_default_na=False)
+    dictionary["Maker_ID"] = dictionary["Maker_ID"].astype(int)
+    return dictionary[DICTIONARY_COLUMNS]
+
+
+def save_maker_dictionary(dictionary, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    dictionary.sort_values(["Maker_ID", "Alias"]).to_csv(path, index=False)
+
+
+def update_maker_dictionary(dictionary, names):
+    """
+    Add unseen maker names to the dictionary.
+
+    Existing aliases keep their IDs. A new alias joins an existing maker when its
+    match key (or a fuzzy variant in the same block) is already known, otherwise it
+    gets the next free integer ID. Returns the updated dictionary.
+    """
+    aliases = sorted({clean_maker_name(name) for name in names} - set(dictionary["Alias"]))
+    if not aliases:
+        return dictionary
+
+    known_keys = dictionary["Alias"].map(maker_match_key)
+    key_to_id = dict(zip(known_keys, dictionary["Maker_ID"]))
+
+    new_keys = {alias: maker_match_key(alias) for alias in aliases}
+    clusters = resolve_key_clusters(set(known_keys) | set(new_keys.values()))
+
+    # Representative keys that already carry an ID keep it
+    root_to_id = {}
+    for key, maker_id in key_to_id.items():
+        root_to_id.setdefault(clusters[key], maker_id)
+
+    next_id = int(dictionary["Maker_ID"].max()) + 1 if not dictionary.empty else 1
+    rows = []
+    for alias in aliases:
+        root = clusters[new_keys[alias]]
+        if root not in root_to_id:
+            root_to_id[root] = next_id
+            next_id += 1
+        rows.append({"Maker_ID": root_to_id[root], "Alias": alias})
+
+    new_rows = pd.DataFrame(rows)
+    names_by_id = dictionary.groupby("Maker_ID")["Maker"].first()
+    # New makers are displayed under their most complete alias
+    new_names = (
+        new_rows.loc[~new_rows["Maker_ID"].isin(names_by_id.index)]
+        .assign(length=lambda df: df["Alias"].str.len())
+        .sort_values(["length", "Alias"], ascending=[False, True])
+        .groupby("Maker_ID")["Alias"]
+        .first()
+    )
+    names_by_id = pd.concat([names_by_id, new_names])
+    new_rows["Maker"] = new_rows["Maker_ID"].map(names_by_id)
+
+    return pd.concat([dictionary, new_rows[DICTIONARY_COLUMNS]], ignore_index=True)
+
+
+def canonicalize_makers(df, dictionary_path, maker_col="Maker"):
+    """
+    Attach stable integer Maker_IDs and canonical maker names to a dataframe.
+
+    Unseen names are added to the dictionary at `dictionary_path`, which is saved
+    back when it changes.
+    """
+    dictionary = load_maker_dictionary(dictionary_path)
+    updated = update_maker_dictionary(dictionary, df[maker_col].unique())
+    if len(updated) != len(dictionary):
+        save_maker_dictionary(updated, dictionary_path)
+
+    lookup = updated.set_index("Alias")
+    aliases = df[maker_col].map(clean_maker_name)
+    df = df.copy()
+    df["Maker_ID"] = aliases.map(lookup["Maker_ID"]).astype(int)
+    df[maker_col] = aliases.map(lookup["Maker"])
+    return df
+
+
+def default_dictionary_path(data_dir):
+    return os.path.join(data_dir, "processed", "maker_dictionary.csv")
+
+
+def build_maker_dictionary(data_dir):
+    """Register every maker name found in the yearly and monthly raw files."""
+    names = set(load_and_clean_maker_csv(os.path.join(data_dir, "yearly", "2021-2025_MAKER.csv"))["Maker"])
+    monthly_data_dir = os.path.join(data_dir, "monthly")
+    for year in monthly_file_years(monthly_data_dir, "MAKER"):
+        maker_file = os.path.join(monthly_data_dir, f"{year}_monthly_MAKER.csv")
+        if os.path.exists(maker_file):
+            names |= set(pd.read_csv(maker_file)["Maker"].astype(str))
+
+    dictionary_path = default_dictionary_path(data_dir)
+    dictionary = update_maker_dictionary(load_maker_dictionary(dictionary_path), names)
+    save_maker_dictionary(dictionary, dictionary_path)
+    return dictionary, dictionary_path
+
+
+def main():
+    project_root = os.path.dirname(os.path.dirname(__file__))
+    data_dir = os.path.join(project_root, "data")
+
+    print("Building maker dictionary...")
+    dictionary, dictionary_path = build_maker_dictionary(data_dir)
+
+    print(f"\n{dictionary['Alias'].nunique()} aliases mapped to {dictionary['Maker_ID'].nunique()} makers")
+    merged = dictionary.groupby("Maker_ID").filter(lambda g: len(g) > 1)
+    print(f"{merged['Maker_ID'].nunique()} makers have more than one alias")
+    print(f"Saved: {dictionary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+
+# Movers tables keep this many climbers and fallers per period and comparison, among the
+# makers ranked within MOVER_MAX_RANK
+MOVERS_PER_DIRECTION = 5
+MOVER_MAX_RANK = 50
+
+
+def compute_market_share(long_df: pd.DataFrame, period_col: str, entity_col: str = "Maker_ID",
+                         value_col: str = "Registrations") -> pd.DataFrame:
+    """
+    Each entity's share of total registrations per period, and its change in percentage
+    points versus the entity's previous period.
+
+    `period_col` must be an integer key where consecutive periods differ by 1 (e.g. Year);
+    a change is only reported when the previous period is present.
+    """
+    df = long_df.dropna(subset=[value_col]).copy()
+    df[value_col] = df[value_col].astype("int64")
+    totals = df.groupby(period_col)[value_col].transform("sum")
+    df["Share_pct"] = (df[value_col] / totals.where(totals != 0) * 100).round(4)
+
+    df = df.sort_values([entity_col, period_col])
+    previous = df.groupby(entity_col)[[period_col, "Share_pct"]].shift()
+    consecutive = previous[period_col] == df[period_col] - 1
+    df["Share_change_pp"] = (df["Share_pct"] - previous["Share_pct"]).where(consecutive).round(4)
+    return df
+
+
+def compute_concentration(share_df: pd.DataFrame, period_col: str, label_cols: list = None,
+                          value_col: str = "Registrations", top_n: int = 5) -> pd.DataFrame:
+    """
+    Herfindahl-Hirschman index (0-10,000) and top-N share per period from a share table.
+
+    `label_cols` (e.g. Year_Quarter) are carried through alongside the integer period key.
+    """
+    df = share_df.sort_values([period_col, "Share_pct"], ascending=[True, False])
+    rank = df.groupby(period_col).cumcount()
+    grouped = df.assign(
+        share_sq=df["Share_pct"] ** 2,
+        top_share=df["Share_pct"].where(rank < top_n, 0),
+        active=df[value_col] > 0,
+    ).groupby([period_col] + (label_cols or []))
+
+    concentration = pd.DataFrame({
+        "Total_Registrations": grouped[value_col].sum(),
+        "Active_Makers": grouped["active"].sum(),
+        # A period without registrations has no shares, so neither measure is defined for it
+        "HHI": grouped["share_sq"].sum(min_count=1).round(2),
+        f"Top{top_n}_share_pct": grouped["top_share"].sum(min_count=1).round(2),
+    }).reset_index()
+
+    concentration = concentration.sort_values(period_col)
+    consecutive = concentration[period_col].diff() == 1
+    concentration["HHI_change"] = concentration["HHI"].diff().where(consecutive).round(2)
+    return concentration
+
+
+def rank_periods(values: np.ndarray) -> np.ndarray:
+    """
+    Competition ranks (1 = largest, ties share the best rank) of an entity x period matrix,
+    ranked within each period column; NaN cells stay unranked.
+
+    A single `np.argsort` along the entity axis orders every period at once.
+    """
+    sort_keys = np.where(np.isnan(values), np.inf, -values)
+    order = np.argsort(sort_keys, axis=0, kind="stable")
+    sorted_keys = np.take_along_axis(sort_keys, order, axis=0)
+    positions = np.arange(1, len(values) + 1)[:, None]
+    starts = np.vstack([np.ones((1, values.shape[1]), dtype=bool), sorted_keys[1:] != sorted_keys[:-1]])
+    sorted_ranks = np.maximum.accumulate(np.where(starts, positions, 0), axis=0).astype(float)
+
+    ranks = np.empty_like(sorted_ranks)
+    np.put_along_axis(ranks, order, sorted_ranks, axis=0)
+    return np.where(np.isnan(values), np.nan, ranks)
+
+
+def compute_rank_movement(long_df: pd.DataFrame, period_col: str, lags: dict, entity_col: str = "Maker_ID",
+                          value_col: str = "Registrations") -> pd.DataFrame:
+    """
+    Each entity's rank by registrations per period, and its rank change versus earlier periods.
+
+    `period_col` must be an integer key where consecutive periods differ by 1, with one row per
+    entity and period. `lags` maps a comparison name to its distance in periods (e.g.
+    {"QoQ": 1, "YoY": 4} for quarter keys); each adds a Rank_change_<name> column, positive
+    when the entity climbed. Only entities with registrations in a period are ranked.
+    """
+    df = long_df[long_df[value_col] > 0].copy()
+    codes, entities = pd.factorize(df[entity_col])
+    keys = df[period_col].to_numpy(dtype=int)
+    cols = keys - keys.min()
+    values = np.full((len(entities), cols.max() + 1), np.nan)
+    values[codes, cols] = df[value_col].to_numpy(dtype=float)
+
+    ranks = rank_periods(values)
+    df["Rank"] = ranks[codes, cols].astype(int)
+    for name, lag in lags.items():
+        previous_cols = cols - lag
+        previous = np.where(previous_cols >= 0, ranks[codes, np.maximum(previous_cols, 0)], np.nan)
+        df[f"Rank_change_{name}"] = previous - df["Rank"]
+    return df.sort_values([period_col, "Rank"]).reset_index(drop=True)
+
+
+def top_movers(rank_df: pd.DataFrame, period_col: str, comparisons: list, label_cols: list = None,
+               top_n: int = MOVERS_PER_DIRECTION, max_rank: int = MOVER_MAX_RANK) -> pd.DataFrame:
+    """
+    The `top_n` biggest climbers and fallers per period for each comparison of a rank table.
+
+    Only entities ranked within `max_rank` in either period are considered, so the long tail of
+    small makers, whose ranks swing by hundreds on a few registrations, does not crowd out the
+    market's real movers.
+    """
+    label_cols = label_cols or []
+    movers = []
+    for comparison in comparisons:
+        change_col = f"Rank_change_{comparison}"
+        df = rank_df.dropna(subset=[change_col]).assign(Comparison=comparison)
+        df["Previous_Rank"] = (df["Rank"] + df[change_col]).astype(int)
+        df["Rank_change"] = df[change_col].astype(int)
+        df = df[(df["Rank"] <= max_rank) | (df["Previous_Rank"] <= max_rank)]
+        for direction, sign in (("Gainer", 1), ("Loser", -1)):
+            moved = df[df["Rank_change"] * sign > 0]
+            moved = moved.assign(Direction=direction, sort_change=moved["Rank_change"] * -sign)
+            moved = moved.sort_values([period_col, "sort_change", "Rank"]).groupby(period_col).head(top_n)
+            movers.append(moved.assign(Position=moved.groupby(period_col).cumcount() + 1))
+
+    columns = [period_col] + label_cols + ["Comparison", "Direction", "Position", "Maker_ID", "Maker",
+                                             "Registrations", "Previous_Rank", "Rank", "Rank_change"]
+    movers = pd.concat(movers, ignore_index=True)[columns]
+    return movers.sort_values([period_col, "Comparison", "Direction", "Position"]).reset_index(drop=True)
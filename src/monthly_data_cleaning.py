@@ -1,6 +1,7 @@
+import argparse
 import pandas as pd
 import os
-from data_cleaning import clean_numeric_columns
+from data_cleaning import clean_numeric_columns, monthly_file_years
 
 
 def load_and_clean_monthly_vehicle_category(filepath):
@@ -19,9 +20,9 @@ def load_and_clean_monthly_vehicle_category(filepath):
         rename_map = {col: name for col, name in zip(raw_df.columns, expected_columns)}
         df = raw_df.rename(columns=rename_map)
     else:
-        # Use the first two columns as S No and Vehicle Category, rest as months
+        # Partial year: S No and Vehicle Category, the months so far, then TOTAL as the last column
         df = raw_df.copy()
-        df.columns = expected_columns[:len(df.columns)]
+        df.columns = expected_columns[:len(df.columns) - 1] + ["TOTAL"]
     
     # Keep only rows that have a numeric S No
     df = df[pd.to_numeric(df["S No"], errors="coerce").notna()].copy()
@@ -48,9 +49,8 @@ def load_and_clean_monthly_maker(filepath):
     if len(df.columns) == len(expected_columns):
         df.columns = expected_columns
     else:
-        # Use available columns
-        available_columns = expected_columns[:len(df.columns)]
-        df.columns = available_columns
+        # Partial year: months so far, with TOTAL always the last column
+        df.columns = expected_columns[:len(df.columns) - 1] + ["TOTAL"]
     
     # Drop any residual header row (NaN in S No / Maker)
     df = df[pd.to_numeric(df["S No"], errors="coerce").notna()].copy()
@@ -66,32 +66,46 @@ def load_and_clean_monthly_maker(filepath):
     return df
 
 
-def process_all_monthly_files(monthly_data_dir):
-    """Process all monthly Excel files and convert to cleaned CSVs."""
+def needs_conversion(excel_file, csv_file):
+    """True when the cleaned CSV is missing or older than its Excel file."""
+    return not os.path.exists(csv_file) or os.path.getmtime(excel_file) > os.path.getmtime(csv_file)
+
+
+def process_all_monthly_files(monthly_data_dir, only_changed=False):
+    """
+    Process all monthly Excel files and convert to cleaned CSVs.
+    
+    With `only_changed`, files whose CSV is already newer than the Excel file are skipped, so
+    their CSVs keep their modification times and the incremental update sees them as unchanged.
+    """
     processed_files = []
     
     # Process vehicle category files
-    for year in range(2021, 2026):
+    for year in monthly_file_years(monthly_data_dir, "VC", extension="xlsx"):
         vc_file = os.path.join(monthly_data_dir, f"{year}_monthly_VC.xlsx")
+        csv_file = os.path.join(monthly_data_dir, f"{year}_monthly_VC.csv")
+        if only_changed and not needs_conversion(vc_file, csv_file):
+            continue
         if os.path.exists(vc_file):
             print(f"Processing {year} vehicle category data...")
             vc_df = load_and_clean_monthly_vehicle_category(vc_file)
             
             # Save as CSV
-            csv_file = os.path.join(monthly_data_dir, f"{year}_monthly_VC.csv")
             vc_df.to_csv(csv_file, index=False)
             processed_files.append(csv_file)
             print(f"Saved: {csv_file}")
     
     # Process maker files
-    for year in range(2021, 2026):
+    for year in monthly_file_years(monthly_data_dir, "MAKER", extension="xlsx"):
         maker_file = os.path.join(monthly_data_dir, f"{year}_monthly_MAKER.xlsx")
+        csv_file = os.path.join(monthly_data_dir, f"{year}_monthly_MAKER.csv")
+        if only_changed and not needs_conversion(maker_file, csv_file):
+            continue
         if os.path.exists(maker_file):
             print(f"Processing {year} maker data...")
             maker_df = load_and_clean_monthly_maker(maker_file)
             
             # Save as CSV
-            csv_file = os.path.join(monthly_data_dir, f"{year}_monthly_MAKER.csv")
             maker_df.to_csv(csv_file, index=False)
             processed_files.append(csv_file)
             print(f"Saved: {csv_file}")
@@ -101,11 +115,16 @@ def process_all_monthly_files(monthly_data_dir):
 
 def main():
     """Main function to process all monthly data files."""
+    parser = argparse.ArgumentParser(description="Convert the monthly Vahan Excel exports to cleaned CSVs.")
+    parser.add_argument("--only-changed", action="store_true",
+                        help="only reconvert the Excel files newer than their CSV (default: every file)")
+    args = parser.parse_args()
+    
     project_root = os.path.dirname(os.path.dirname(__file__))
     monthly_data_dir = os.path.join(project_root, "data", "monthly")
     
     print("Processing monthly data files...")
-    processed_files = process_all_monthly_files(monthly_data_dir)
+    processed_files = process_all_monthly_files(monthly_data_dir, only_changed=args.only_changed)
     
     print(f"\nProcessed {len(processed_files)} files:")
     for file in processed_files:
@@ -1,6 +1,27 @@
 import pandas as pd
 import os
-from data_cleaning import clean_numeric_columns
+from data_cleaning import clean_numeric_columns, monthly_file_years
+from maker_canonicalization import canonicalize_makers
+from dashboard_data import build_snapshot, default_processed_dir
+from market_metrics import compute_market_share, compute_concentration, compute_rank_movement, top_movers
+from anomaly_detection import score_anomalies
+from pipeline_state import file_state, save_state
+from time_buckets import MONTHS, aggregate_buckets, bucket_start_keys, compute_growth, melt_months, ytd_cube
+
+
+# Map to vehicle groups (2W/3W/4W)
+VC_GROUP_MAP = {
+    "2W": ["TWO WHEELER"],
+    "3W": ["THREE WHEELER"],
+    "4W": [
+        "FOUR WHEELER", "LIGHT MOTOR VEHICLE", "MEDIUM MOTOR VEHICLE",
+        "HEAVY MOTOR VEHICLE", "LIGHT PASSENGER VEHICLE", "MEDIUM PASSENGER VEHICLE",
+        "HEAVY PASSENGER VEHICLE", "LIGHT GOODS VEHICLE", "MEDIUM GOODS VEHICLE", "HEAVY GOODS VEHICLE"
+    ]
+}
+
+# A latest month below this share of the same month a year earlier is treated as partially collected
+PARTIAL_MONTH_RATIO = 0.5
 
 
 def load_monthly_csv(filepath):
@@ -9,164 +30,222 @@ def load_monthly_csv(filepath):
     return df
 
 
-def aggregate_to_quarters(df, id_cols):
-    """Aggregate monthly data to quarterly data."""
-    # Define quarter mapping
-    quarter_map = {
-        'JAN': 'Q1', 'FEB': 'Q1', 'MAR': 'Q1',
-        'APR': 'Q2', 'MAY': 'Q2', 'JUN': 'Q2',
-        'JUL': 'Q3', 'AUG': 'Q3', 'SEP': 'Q3',
-        'OCT': 'Q4', 'NOV': 'Q4', 'DEC': 'Q4'
-    }
-    
-    # Get month columns (excluding TOTAL)
-    month_cols = [col for col in df.columns if col in ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']]
-    
-    # Create quarterly data
-    quarterly_data = []
-    
-    for _, row in df.iterrows():
-        for year in range(2021, 2026):
-            year_data = {}
-            year_data.update({col: row[col] for col in id_cols})
-            year_data['Year'] = year
-            
-            # Aggregate months to quarters
-            for quarter in ['Q1', 'Q2', 'Q3', 'Q4']:
-                quarter_months = [month for month, q in quarter_map.items() if q == quarter and month in month_cols]
-                if quarter_months:
-                    quarter_total = sum(row[month] for month in quarter_months if pd.notna(row[month]))
-                    year_data[quarter] = quarter_total
-            
-            quarterly_data.append(year_data)
-    
-    return pd.DataFrame(quarterly_data)
+# Every output is stored period first, oldest period first. Appending a month then only changes
+# the rows of the latest periods, at the end of each file, so the incremental update rewrites
+# just that tail (see incremental_update.write_patched).
 
 
-def melt_quarters(df, id_cols):
-    """Convert quarterly data to long format."""
-    quarter_cols = ['Q1', 'Q2', 'Q3', 'Q4']
-    available_quarters = [col for col in quarter_cols if col in df.columns]
-    
-    if not available_quarters:
-        return pd.DataFrame()
-    
-    long_df = df.melt(
-        id_vars=id_cols + ['Year'],
-        value_vars=available_quarters,
-        var_name='Quarter',
-        value_name='Registrations'
+def quarterly_output(quarters, id_cols):
+    """Calendar-quarter buckets in the quarterly QoQ file layout, with QoQ computed on the integer quarter key."""
+    quarterly = quarters.rename(columns={'Period_Key': 'Quarter_Key', 'Period': 'Year_Quarter'})
+    quarterly = compute_growth(quarterly, id_cols, key_col='Quarter_Key', growth_col='QoQ_pct')
+    return quarterly_layout(quarterly, id_cols)
+
+
+def quarterly_layout(quarterly, id_cols):
+    """Column layout of the quarterly QoQ files, from rows with Quarter_Key, Year_Quarter and QoQ_pct."""
+    quarterly = quarterly.copy()
+    quarterly['Year'] = quarterly['Quarter_Key'] // 4
+    quarterly['Quarter'] = 'Q' + (quarterly['Quarter_Key'] % 4 + 1).astype(str)
+    quarterly = quarterly.sort_values(['Quarter_Key'] + id_cols, kind='stable').reset_index(drop=True)
+    return quarterly[id_cols + ['Year', 'Quarter', 'Quarter_Key', 'Year_Quarter', 'Registrations', 'Months', 'QoQ_pct']]
+
+
+def periods_output(buckets, id_cols):
+    """Every bucket type in one long table, with growth versus the previous period of the same type."""
+    periods = pd.concat(
+        [bucket_df.assign(Bucket=name) for name, bucket_df in buckets.items()],
+        ignore_index=True
     )
+    periods = compute_growth(periods, ['Bucket'] + id_cols)
+    return sort_periods(periods[['Bucket'] + id_cols + ['Period_Key', 'Period', 'Registrations', 'Months', 'Growth_pct']], id_cols)
+
+
+def sort_periods(periods, id_cols):
+    """Periods ordered by their first month across bucket types, then bucket type and entity."""
+    start_keys = bucket_start_keys(periods['Bucket'], periods['Period_Key'])
+    order = periods.assign(Start_Key=start_keys).sort_values(['Start_Key', 'Bucket'] + id_cols, kind='stable').index
+    return periods.loc[order].reset_index(drop=True)
+
+
+def ytd_output(monthly_long, id_cols):
+    """YTD cube: registrations through every cutoff month of every year, against the same months a year earlier."""
+    return sort_ytd(flag_partial_month(add_ytd_yoy(ytd_cube(monthly_long, id_cols))), id_cols)
+
+
+def sort_ytd(ytd, id_cols):
+    return ytd.sort_values(['Year', 'Cutoff_Month'] + id_cols, kind='stable').reset_index(drop=True)
+
+
+def add_ytd_yoy(ytd):
+    prior = ytd['Prior_YTD_Registrations'].where(ytd['Prior_YTD_Registrations'] != 0)
+    ytd['YTD_YoY_pct'] = ((ytd['YTD_Registrations'] / prior - 1) * 100).round(2)
+    return ytd
+
+
+def flag_partial_month(ytd):
+    """
+    Mark the YTD cube's latest cutoff as Partial_Month when that month's total across all entities
+    is below PARTIAL_MONTH_RATIO of the same month a year earlier, i.e. the data was collected
+    mid-month, so comparisons can fall back to the last complete cutoff.
+    """
+    ytd['Partial_Month'] = False
+    latest_year = ytd['Year'].max()
+    totals = ytd[ytd['Year'] == latest_year].groupby('Cutoff_Month')[['YTD_Registrations', 'Prior_YTD_Registrations']].sum()
+    if totals.empty:
+        return ytd
+    month_totals = totals.diff().fillna(totals).iloc[-1]
+    if month_totals['YTD_Registrations'] < PARTIAL_MONTH_RATIO * month_totals['Prior_YTD_Registrations']:
+        ytd['Partial_Month'] = (ytd['Year'] == latest_year) & (ytd['Cutoff_Month'] == totals.index[-1])
+    return ytd
+
+
+def quarterly_market_metrics(maker_quarterly):
+    """Market share and concentration per quarter, keyed on the integer quarter key."""
+    maker_share = compute_market_share(
+        maker_quarterly[['Maker_ID', 'Maker', 'Year', 'Quarter', 'Year_Quarter', 'Quarter_Key', 'Registrations']],
+        period_col='Quarter_Key'
+    )
+    maker_concentration = compute_concentration(
+        maker_share, period_col='Quarter_Key', label_cols=['Year', 'Quarter', 'Year_Quarter']
+    )
+    maker_share = maker_share.sort_values(['Quarter_Key', 'Maker_ID'], kind='stable').reset_index(drop=True)
+    return maker_share, maker_concentration
+
+
+def quarterly_rank_movement(maker_quarterly):
+    """Maker ranks per quarter with their change QoQ and versus the same quarter a year earlier, and the top movers."""
+    maker_ranks = compute_rank_movement(
+        maker_quarterly[['Maker_ID', 'Maker', 'Year', 'Quarter', 'Year_Quarter', 'Quarter_Key', 'Registrations']],
+        period_col='Quarter_Key', lags={'QoQ': 1, 'YoY': 4}
+    )
+    maker_movers = top_movers(
+        maker_ranks, period_col='Quarter_Key', comparisons=['QoQ', 'YoY'], label_cols=['Year', 'Quarter', 'Year_Quarter']
+    )
+    return maker_ranks, maker_movers
+
+
+def vc_monthly_rows(vc_df, year):
+    """One year's vehicle category file as long rows per category and month, tagged with its group."""
+    vc_monthly_data = []
+    for group, keywords in VC_GROUP_MAP.items():
+        mask = vc_df["Vehicle Category"].str.contains("|".join(keywords), case=False, na=False)
+        if mask.any():
+            subset = vc_df.loc[mask].assign(Group=group)
+            vc_monthly_data.append(melt_months(subset, ['Group', 'Vehicle Category'], year))
+    return pd.concat(vc_monthly_data, ignore_index=True)
+
+
+def maker_monthly_rows(maker_df, year, dictionary_path):
+    """One year's manufacturer file as long rows per canonical maker and month."""
+    # Collapse name variants onto their stable maker IDs
+    maker_df = canonicalize_makers(maker_df, dictionary_path)
+    month_cols = [col for col in maker_df.columns if col in MONTHS]
+    maker_df = maker_df.groupby(['Maker_ID', 'Maker'], as_index=False)[month_cols].sum(min_count=1)
+    return melt_months(maker_df, ['Maker_ID', 'Maker'], year)
+
+
+def load_vc_monthly(monthly_data_dir, states=None):
+    """
+    All years of vehicle category monthly data as long rows per vehicle category and month.
     
-    # Create Year-Quarter column
-    long_df['Year_Quarter'] = long_df['Year'].astype(str) + '-' + long_df['Quarter']
-    
-    # Sort by group and year-quarter
-    long_df = long_df.sort_values(id_cols + ['Year_Quarter'])
+    When `states` is given, each file's pipeline state is recorded in it by filename.
+    """
+    vc_monthly_data = []
+    for year in monthly_file_years(monthly_data_dir, "VC"):
+        vc_file = os.path.join(monthly_data_dir, f"{year}_monthly_VC.csv")
+        if os.path.exists(vc_file):
+            print(f"  Loading {year} vehicle category data...")
+            vc_df = load_monthly_csv(vc_file)
+            if states is not None:
+                states[os.path.basename(vc_file)] = file_state(vc_df, 'Vehicle Category', vc_file)
+            vc_monthly_data.append(vc_monthly_rows(vc_df, year))
     
-    return long_df
+    return pd.concat(vc_monthly_data, ignore_index=True) if vc_monthly_data else pd.DataFrame()
 
 
-def compute_qoq(long_df, group_col):
-    """Compute Quarter-over-Quarter percentage change."""
-    long_df = long_df.copy()
-    
-    # Calculate QoQ percentage change
-    long_df['QoQ_pct'] = (
-        long_df.groupby(group_col)['Registrations']
-        .pct_change()
-        .multiply(100)
-        .round(2)
-    )
+def load_maker_monthly(monthly_data_dir, dictionary_path, states=None):
+    """All years of manufacturer monthly data as long rows per canonical maker and month."""
+    maker_monthly_data = []
+    for year in monthly_file_years(monthly_data_dir, "MAKER"):
+        maker_file = os.path.join(monthly_data_dir, f"{year}_monthly_MAKER.csv")
+        if os.path.exists(maker_file):
+            print(f"  Loading {year} manufacturer data...")
+            maker_df = load_monthly_csv(maker_file)
+            if states is not None:
+                states[os.path.basename(maker_file)] = file_state(maker_df, 'Maker', maker_file)
+            maker_monthly_data.append(maker_monthly_rows(maker_df, year, dictionary_path))
     
-    return long_df
+    return pd.concat(maker_monthly_data, ignore_index=True) if maker_monthly_data else pd.DataFrame()
+
 
+def save_outputs(outputs, processed_dir):
+    paths = {}
+    for name, df in outputs.items():
+        output_path = os.path.join(processed_dir, name)
+        df.to_csv(output_path, index=False)
+        print(f"  Saved: {output_path}")
+        paths[name] = output_path
+    return paths
 
-def process_monthly_data(monthly_data_dir):
-    """Process all monthly data and create quarterly analysis."""
-    processed_dir = os.path.join(os.path.dirname(monthly_data_dir), "processed")
+
+def process_monthly_data(monthly_data_dir, processed_dir=None):
+    """Process all monthly data into quarterly, half-year and fiscal period analysis."""
+    processed_dir = processed_dir or os.path.join(os.path.dirname(monthly_data_dir), "processed")
     os.makedirs(processed_dir, exist_ok=True)
     
     # Process vehicle category data
     print("Processing vehicle category monthly data...")
-    vc_quarterly_data = []
-    
-    for year in range(2021, 2026):
-        vc_file = os.path.join(monthly_data_dir, f"{year}_monthly_VC.csv")
-        if os.path.exists(vc_file):
-            print(f"  Processing {year} vehicle category data...")
-            vc_df = load_monthly_csv(vc_file)
-            
-            # Aggregate to quarters
-            quarterly_df = aggregate_to_quarters(vc_df, ['S No', 'Vehicle Category'])
-            vc_quarterly_data.append(quarterly_df)
-    
-    # Combine all years
-    if vc_quarterly_data:
-        vc_combined = pd.concat(vc_quarterly_data, ignore_index=True)
-        
-        # Map to vehicle groups (2W/3W/4W)
-        group_map = {
-            "2W": ["TWO WHEELER"],
-            "3W": ["THREE WHEELER"],
-            "4W": [
-                "FOUR WHEELER", "LIGHT MOTOR VEHICLE", "MEDIUM MOTOR VEHICLE",
-                "HEAVY MOTOR VEHICLE", "LIGHT PASSENGER VEHICLE", "MEDIUM PASSENGER VEHICLE",
-                "HEAVY PASSENGER VEHICLE", "LIGHT GOODS VEHICLE", "MEDIUM GOODS VEHICLE", "HEAVY GOODS VEHICLE"
-            ]
-        }
-        
-        vc_grouped_data = []
-        for group, keywords in group_map.items():
-            mask = vc_combined["Vehicle Category"].str.contains("|".join(keywords), case=False, na=False)
-            subset = vc_combined.loc[mask]
-            if not subset.empty:
-                subset = subset.copy()
-                subset['Group'] = group
-                vc_grouped_data.append(subset)
-        
-        if vc_grouped_data:
-            vc_final = pd.concat(vc_grouped_data, ignore_index=True)
-            
-            # Convert to long format and calculate QoQ
-            vc_long = melt_quarters(vc_final, ['Group'])
-            vc_long = compute_qoq(vc_long, 'Group')
-            
-            # Save vehicle category quarterly data
-            vc_output_path = os.path.join(processed_dir, "vehicle_category_quarterly_qoq.csv")
-            vc_long.to_csv(vc_output_path, index=False)
-            print(f"  Saved: {vc_output_path}")
+    states = {}
+    vc_monthly = load_vc_monthly(monthly_data_dir, states)
+    if not vc_monthly.empty:
+        # Every bucket type from one pass over the monthly data
+        vc_buckets = aggregate_buckets(vc_monthly, ['Group'])
+        save_outputs({
+            "vehicle_category_quarterly_qoq.csv": quarterly_output(vc_buckets['calendar_quarter'], ['Group']),
+            "vehicle_category_periods.csv": periods_output(vc_buckets, ['Group']),
+            "vehicle_category_ytd_cube.csv": ytd_output(vc_monthly, ['Group']),
+            # Flag unusual category months against their seasonal and trailing baselines
+            "vehicle_category_anomalies.csv": score_anomalies(vc_monthly, ['Group', 'Vehicle Category'], recent_first=False),
+        }, processed_dir)
     
     # Process manufacturer data
     print("Processing manufacturer monthly data...")
-    maker_quarterly_data = []
-    
-    for year in range(2021, 2026):
-        maker_file = os.path.join(monthly_data_dir, f"{year}_monthly_MAKER.csv")
-        if os.path.exists(maker_file):
-            print(f"  Processing {year} manufacturer data...")
-            maker_df = load_monthly_csv(maker_file)
-            
-            # Aggregate to quarters
-            quarterly_df = aggregate_to_quarters(maker_df, ['S No', 'Maker'])
-            maker_quarterly_data.append(quarterly_df)
+    dictionary_path = os.path.join(processed_dir, "maker_dictionary.csv")
+    maker_monthly = load_maker_monthly(monthly_data_dir, dictionary_path, states)
+    if not maker_monthly.empty:
+        maker_buckets = aggregate_buckets(maker_monthly, ['Maker_ID', 'Maker'])
+        maker_quarterly = quarterly_output(maker_buckets['calendar_quarter'], ['Maker_ID', 'Maker'])
+        maker_share, maker_concentration = quarterly_market_metrics(maker_quarterly)
+        maker_ranks, maker_movers = quarterly_rank_movement(maker_quarterly)
+        save_outputs({
+            "maker_quarterly_qoq.csv": maker_quarterly,
+            "maker_periods.csv": periods_output(maker_buckets, ['Maker_ID', 'Maker']),
+            "maker_ytd_cube.csv": ytd_output(maker_monthly, ['Maker_ID', 'Maker']),
+            "maker_share_quarterly.csv": maker_share,
+            "maker_concentration_quarterly.csv": maker_concentration,
+            "maker_ranks_quarterly.csv": maker_ranks,
+            "maker_movers_quarterly.csv": maker_movers,
+            "maker_anomalies.csv": score_anomalies(maker_monthly, ['Maker_ID', 'Maker'], recent_first=False),
+        }, processed_dir)
     
-    # Combine all years
-    if maker_quarterly_data:
-        maker_combined = pd.concat(maker_quarterly_data, ignore_index=True)
-        
-        # Convert to long format and calculate QoQ
-        maker_long = melt_quarters(maker_combined, ['Maker'])
-        maker_long = compute_qoq(maker_long, 'Maker')
-        
-        # Save manufacturer quarterly data
-        maker_output_path = os.path.join(processed_dir, "maker_quarterly_qoq.csv")
-        maker_long.to_csv(maker_output_path, index=False)
-        print(f"  Saved: {maker_output_path}")
+    # Record which monthly files (and months) the outputs cover, for incremental updates
+    state_path = save_state(processed_dir, states)
     
     return {
         'vc_quarterly_path': os.path.join(processed_dir, "vehicle_category_quarterly_qoq.csv"),
-        'maker_quarterly_path': os.path.join(processed_dir, "maker_quarterly_qoq.csv")
+        'vc_periods_path': os.path.join(processed_dir, "vehicle_category_periods.csv"),
+        'vc_ytd_path': os.path.join(processed_dir, "vehicle_category_ytd_cube.csv"),
+        'maker_quarterly_path': os.path.join(processed_dir, "maker_quarterly_qoq.csv"),
+        'maker_periods_path': os.path.join(processed_dir, "maker_periods.csv"),
+        'maker_ytd_path': os.path.join(processed_dir, "maker_ytd_cube.csv"),
+        'maker_share_quarterly_path': os.path.join(processed_dir, "maker_share_quarterly.csv"),
+        'maker_concentration_quarterly_path': os.path.join(processed_dir, "maker_concentration_quarterly.csv"),
+        'maker_ranks_quarterly_path': os.path.join(processed_dir, "maker_ranks_quarterly.csv"),
+        'maker_movers_quarterly_path': os.path.join(processed_dir, "maker_movers_quarterly.csv"),
+        'vc_anomalies_path': os.path.join(processed_dir, "vehicle_category_anomalies.csv"),
+        'maker_anomalies_path': os.path.join(processed_dir, "maker_anomalies.csv"),
+        'state_path': state_path
     }
 
 
@@ -174,9 +253,13 @@ def main():
     """Main function to process monthly data."""
     project_root = os.path.dirname(os.path.dirname(__file__))
     monthly_data_dir = os.path.join(project_root, "data", "monthly")
+    processed_dir = default_processed_dir()
     
     print("Processing monthly data for quarterly analysis...")
-    outputs = process_monthly_data(monthly_data_dir)
+    outputs = process_monthly_data(monthly_data_dir, processed_dir)
+    snapshot_path = build_snapshot(processed_dir)
+    if snapshot_path:
+        outputs['snapshot_path'] = snapshot_path
     
     print("\nProcessing complete!")
     print("Output files:")
@@ -0,0 +1,176 @@
+import collections
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from dashboard_data import load_dashboard_data
+from figure_cache import data_version
+from snapshot import PROCESSED_DIR_ENV, SNAPSHOT_FILENAME
+
+
+# Background refresh for a running dashboard. The pipeline scripts run one after another in a
+# low-priority child process, so user reruns never wait on them or compete with them for the GIL,
+# and the dashboard keeps serving the data it already holds. The steps write into a staging copy
+# of the processed directory; only once every step has succeeded are the changed files moved
+# into place with os.replace, and the new snapshot loaded (in the worker thread) and swapped in
+# with a single reference assignment. A failed refresh leaves both the served data and the
+# processed files untouched.
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Each step is a script in src/ and its arguments. The incremental mode only reconverts the
+# monthly Excel files that changed, so untouched CSVs keep their mtimes and stay "unchanged".
+REFRESH_MODES = {
+    "full": [["monthly_data_cleaning.py"], ["data_processing.py"], ["monthly_data_processing.py"]],
+    "incremental": [["monthly_data_cleaning.py", "--only-changed"], ["incremental_update.py"]],
+}
+
+LOG_LINES = 200
+
+# The steps run under nice(1) rather than renicing in a preexec_fn, which is not safe to run
+# between fork and exec in a process with other threads (the Streamlit server)
+NICE_PREFIX = ["nice", "-n", "10"] if shutil.which("nice") else []
+
+
+class DataStore:
+    """
+    The processed data shared by every session: (frames, extras, options, version).
+
+    `current` is replaced as a whole, so a session that reads it once per rerun always sees
+    one consistent version, even while a refresh swaps in the next.
+    """
+
+    def __init__(self, processed_dir):
+        self.processed_dir = processed_dir
+        self.current = self._load()
+
+    def _load(self):
+        version = data_version(self.processed_dir)
+        frames, extras, options = load_dashboard_data(self.processed_dir)
+        return frames, extras, options, version
+
+    def reload(self):
+        """Swap in the processed outputs as they are now, unless they are the version already served."""
+        if data_version(self.processed_dir) != self.current[3]:
+            self.current = self._load()
+        return self.current[3]
+
+
+class RefreshJob:
+    """One refresh at a time: runs the steps of a mode in a worker thread and records its progress."""
+
+    def __init__(self, store, on_swap=None):
+        self.store = store
+        self.on_swap = on_swap
+        self._lock = threading.Lock()
+        self._status = {"state": "idle"}
+        self._log = collections.deque(maxlen=LOG_LINES)
+
+    def status(self):
+        """A copy of the current progress, with the tail of the step output."""
+        with self._lock:
+            return dict(self._status, log=list(self._log))
+
+    def _update(self, **fields):
+        with self._lock:
+            self._status.update(fields)
+
+    def _append(self, line):
+        with self._lock:
+            self._log.append(line)
+
+    def start(self, mode="full"):
+        """Start a refresh in the background; False when one is already running."""
+        steps = REFRESH_MODES[mode]
+        with self._lock:
+            if self._status["state"] == "running":
+                return False
+            self._log.clear()
+            self._status = {
+                "state": "running", "mode": mode, "steps": steps, "step": 0,
+                "started_at": time.time(), "finished_at": None, "error": None,
+            }
+        threading.Thread(target=self._run, args=(steps,), name="pipeline-refresh", daemon=True).start()
+        return True
+
+    def _run(self, steps):
+        staging_dir = None
+        try:
+            self._update(current="staging the processed files")
+            staging_dir = stage_processed_dir(self.store.processed_dir)
+            for index, step in enumerate(steps):
+                script = step[0]
+                self._update(step=index + 1, current=script)
+                self._append(f"$ python {' '.join(step)}")
+                started = time.time()
+                returncode = run_step(step, self._append, processed_dir=staging_dir)
+                if returncode != 0:
+                    raise RuntimeError(f"{script} exited with code {returncode}")
+                self._append(f"  ({script} finished in {time.time() - started:.1f}s)")
+
+            self._update(current="publishing the new outputs")
+            published = publish_staged(staging_dir, self.store.processed_dir)
+            self._append(f"Published {len(published)} changed files")
+            self._update(current="loading the new snapshot")
+            version = self.store.reload()
+            if self.on_swap is not None:
+                self.on_swap()
+            self._update(state="succeeded", version=version, finished_at=time.time())
+        except Exception as exc:
+            self._update(state="failed", error=str(exc), finished_at=time.time())
+        finally:
+            if staging_dir is not None:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def stage_processed_dir(processed_dir):
+    """A sibling copy of the processed files (without the figure cache) for a refresh's steps to write into."""
+    staging_dir = tempfile.mkdtemp(prefix=".refresh-", dir=os.path.dirname(os.path.abspath(processed_dir)))
+    for entry in os.scandir(processed_dir):
+        if entry.is_file() and not entry.name.endswith(".tmp"):
+            shutil.copy2(entry.path, staging_dir)
+    return staging_dir
+
+
+def publish_staged(staging_dir, processed_dir):
+    """
+    Move the files a refresh wrote into the processed directory with os.replace, the snapshot
+    first, and return their names. Files the steps left as copied are skipped.
+
+    The snapshot is built after the CSVs, so it stays fresh while the CSVs follow it, and a
+    cold start in between loads the new snapshot rather than a mix of old and new CSVs.
+    """
+    published = []
+    for name in sorted(os.listdir(staging_dir), key=lambda name: name != SNAPSHOT_FILENAME):
+        source, target = os.path.join(staging_dir, name), os.path.join(processed_dir, name)
+        staged = os.stat(source)
+        if os.path.exists(target):
+            current = os.stat(target)
+            if (current.st_size, current.st_mtime_ns) == (staged.st_size, staged.st_mtime_ns):
+                continue
+        os.replace(source, target)
+        published.append(name)
+    return published
+
+
+def run_step(step, log, processed_dir=None):
+    """
+    Run one pipeline step ([script, *args] from src/) in a low-priority child process, passing
+    each output line to `log`. With `processed_dir` the step writes its outputs there.
+    """
+    script, *args = step
+    process = subprocess.Popen(
+        NICE_PREFIX + [sys.executable, "-u", os.path.join(SRC_DIR, script)] + args,
+        cwd=SRC_DIR,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        env=dict(os.environ, **{PROCESSED_DIR_ENV: processed_dir}) if processed_dir else None,
+    )
+    for line in process.stdout:
+        log(line.rstrip())
+    return process.wait()
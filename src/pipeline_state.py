@@ -0,0 +1,63 @@
+import json
+import os
+
+import pandas as pd
+
+from time_buckets import MONTHS
+
+
+# Manifest of the monthly files the processed outputs were built from. Each file records
+# its month columns and a row-order independent digest of their values, so an update can
+# tell a newly appended month apart from revised history.
+
+STATE_FILENAME = "pipeline_state.json"
+STATE_VERSION = 1
+
+
+def state_path(processed_dir):
+    return os.path.join(processed_dir, STATE_FILENAME)
+
+
+def months_digest(df, name_col, month_cols):
+    """Digest of the name and month values of every row with data in `month_cols`."""
+    values = df[[name_col] + month_cols].astype({col: float for col in month_cols})
+    has_data = values[month_cols].fillna(0).ne(0).any(axis=1)
+    return str(int(pd.util.hash_pandas_object(values[has_data], index=False).sum()))
+
+
+def file_state(df, name_col, path):
+    """Month columns and their digest for a loaded monthly file, plus the file's size and mtime."""
+    month_cols = [col for col in df.columns if col in MONTHS]
+    stat = os.stat(path)
+    return {
+        "months": month_cols,
+        "digest": months_digest(df, name_col, month_cols),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def is_unchanged(file_entry, path):
+    """Whether a file still has the size and mtime recorded in its state entry."""
+    stat = os.stat(path)
+    return file_entry.get("size") == stat.st_size and file_entry.get("mtime_ns") == stat.st_mtime_ns
+
+
+def load_state(processed_dir):
+    """The saved manifest, or None when missing or from another version."""
+    try:
+        with open(state_path(processed_dir)) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == STATE_VERSION else None
+
+
+def save_state(processed_dir, files):
+    """Write the manifest ({filename: file_state}) atomically."""
+    path = state_path(processed_dir)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": STATE_VERSION, "files": files}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,106 @@
+import os
+import pickle
+
+# Deliberately free of pandas/plotly imports: the dashboard reads the sidebar options
+# from the snapshot header first, and only unpickling the frames pulls in pandas.
+
+SNAPSHOT_FILENAME = "dashboard_snapshot.pkl"
+
+# Overrides where the pipelines write and the dashboard reads the processed files
+PROCESSED_DIR_ENV = "DASHBOARD_PROCESSED_DIR"
+# Bump SNAPSHOT_VERSION whenever what is pickled changes shape: the header keys, the order or
+# columns of the frames, a new extra table, or a change to how read_processed_data derives them.
+# A snapshot from another version is ignored and the CSVs are read instead, so a deploy never
+# serves frames pickled by older code; mtimes alone cannot catch that because the CSVs are unchanged.
+SNAPSHOT_VERSION = 4
+
+# Processed files the snapshot is built from; a newer source means the snapshot is stale
+SOURCE_FILES = [
+    "vehicle_category_group_yoy.csv",
+    "maker_yoy.csv",
+    "vehicle_category_quarterly_qoq.csv",
+    "maker_quarterly_qoq.csv",
+]
+
+# Year-to-date cubes the yearly frames' partial latest year is restated from, when present
+YTD_CUBE_FILES = {
+    "vc": "vehicle_category_ytd_cube.csv",
+    "maker": "maker_ytd_cube.csv",
+}
+
+# Precomputed pipeline outputs the dashboard shows when present, by name
+EXTRA_FILES = {
+    "maker_share_yearly": "maker_share_yearly.csv",
+    "maker_share_quarterly": "maker_share_quarterly.csv",
+    "maker_concentration_yearly": "maker_concentration_yearly.csv",
+    "maker_concentration_quarterly": "maker_concentration_quarterly.csv",
+    "maker_movers_yearly": "maker_movers_yearly.csv",
+    "maker_movers_quarterly": "maker_movers_quarterly.csv",
+    "maker_anomalies": "maker_anomalies.csv",
+    "vehicle_category_ytd_cube": "vehicle_category_ytd_cube.csv",
+    "vehicle_category_anomalies": "vehicle_category_anomalies.csv",
+}
+
+
+def tracked_files():
+    """Every processed file the dashboard data is built from."""
+    return SOURCE_FILES + list(YTD_CUBE_FILES.values()) + list(EXTRA_FILES.values())
+
+
+def default_processed_dir():
+    """data/processed, unless PROCESSED_DIR_ENV names another directory (a refresh's staging copy)."""
+    if os.environ.get(PROCESSED_DIR_ENV):
+        return os.environ[PROCESSED_DIR_ENV]
+    project_root = os.path.dirname(os.path.dirname(__file__))
+    return os.path.join(project_root, "data", "processed")
+
+
+def snapshot_path(processed_dir):
+    return os.path.join(processed_dir, SNAPSHOT_FILENAME)
+
+
+def write_snapshot(processed_dir, frames, extras, options):
+    """
+    Pickle the sidebar options, the dashboard frames and the optional extra tables,
+    replacing any previous snapshot atomically.
+
+    The options (plain Python lists/dicts) are written as a separate first pickle so they
+    can be read without unpickling the frames.
+    """
+    path = snapshot_path(processed_dir)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"version": SNAPSHOT_VERSION, "options": options}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump((frames, extras), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _is_fresh(processed_dir):
+    path = snapshot_path(processed_dir)
+    if not os.path.exists(path):
+        return False
+    built_at = os.path.getmtime(path)
+    for name in tracked_files():
+        source = os.path.join(processed_dir, name)
+        if os.path.exists(source) and os.path.getmtime(source) > built_at:
+            return False
+    return True
+
+
+def load_snapshot(processed_dir, with_frames=True):
+    """
+    Return {"options": ..., "frames": ..., "extras": ...} from the snapshot, or None when it is missing,
+    from another version, or older than the processed files. With `with_frames=False`
+    only the options header is read.
+    """
+    if not _is_fresh(processed_dir):
+        return None
+    with open(snapshot_path(processed_dir), "rb") as f:
+        header = pickle.load(f)
+        if header.get("version") != SNAPSHOT_VERSION:
+            return None
+        snapshot = {"options": header["options"]}
+        if with_frames:
+            snapshot["frames"], snapshot["extras"] = pickle.load(f)
+    return snapshot
@@ -0,0 +1,71 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+TIMINGS = ("first_element", "sidebar", "first_chart", "full_render")
+
+# Runs inside a fresh interpreter so every import and file read is paid again, like a new replica
+_CHILD = r"""
+import json, sys, time
+from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+from streamlit.testing.v1 import AppTest
+
+sys.path.insert(0, sys.argv[2])
+marks = {}
+_enqueue = ScriptRunContext.enqueue
+
+def enqueue(self, msg):
+    if msg.WhichOneof("type") == "delta" and msg.delta.WhichOneof("type") == "new_element":
+        element = msg.delta.new_element.WhichOneof("type")
+        marks.setdefault("first_element", time.perf_counter())
+        marks.setdefault({"multiselect": "sidebar", "plotly_chart": "first_chart"}.get(element, element), time.perf_counter())
+    return _enqueue(self, msg)
+
+ScriptRunContext.enqueue = enqueue
+app = AppTest.from_file(sys.argv[1], default_timeout=300)
+start = time.perf_counter()
+app.run()
+end = time.perf_counter()
+marks["full_render"] = end
+print(json.dumps({
+    **{key: marks[key] - start for key in json.loads(sys.argv[3])},
+    "exceptions": [str(e.value) for e in app.exception],
+}))
+"""
+
+
+def measure_cold_start(script_path, runs=5):
+    """Time the first script run of the dashboard in `runs` fresh processes."""
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD, script_path, os.path.dirname(script_path), json.dumps(TIMINGS)],
+            capture_output=True, text=True, check=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if result["exceptions"]:
+            raise RuntimeError(f"Dashboard raised: {result['exceptions']}")
+        results.append(result)
+    return {key: statistics.median(r[key] for r in results) for key in TIMINGS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure dashboard time-to-first-render in fresh processes.")
+    parser.add_argument("--script", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard.py"))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = measure_cold_start(os.path.abspath(args.script), runs=args.runs)
+    print(f"Cold start over {args.runs} fresh processes (median):")
+    print(f"  First element:  {timings['first_element'] * 1000:.0f} ms")
+    print(f"  Sidebar ready:  {timings['sidebar'] * 1000:.0f} ms")
+    print(f"  First chart:    {timings['first_chart'] * 1000:.0f} ms")
+    print(f"  Full render:    {timings['full_render'] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
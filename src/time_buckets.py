@@ -0,0 +1,197 @@
+import numpy as np
+
+
+MONTHS = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+# Periods are identified by integer keys: a month key counts months since year 0
+# (year * 12 + month - 1), and a bucket key counts buckets of `months` months whose first
+# bucket starts at `start_month` of year 0. Consecutive periods therefore always differ by 1,
+# and sorting or comparing periods never depends on their string labels.
+
+
+def month_key(year, month):
+    """Integer key of a calendar month (month 1-12)."""
+    return year * 12 + month - 1
+
+
+def bucket_keys(month_keys, months, start_month=1):
+    """Bucket key of each month key for buckets of `months` months starting at `start_month`."""
+    return (np.asarray(month_keys) - (start_month - 1)) // months
+
+
+def bucket_start(keys, months, start_month=1):
+    """(year, month) of the first month of each bucket key."""
+    first = np.asarray(keys) * months + (start_month - 1)
+    return first // 12, first % 12 + 1
+
+
+def _calendar_quarter_label(keys):
+    return [f"{key // 4}-Q{key % 4 + 1}" for key in keys]
+
+
+def _half_year_label(keys):
+    return [f"{key // 2}-H{key % 2 + 1}" for key in keys]
+
+
+def _calendar_year_label(keys):
+    return [str(key) for key in keys]
+
+
+def _fiscal_quarter_label(keys):
+    # Indian fiscal year FY2025-26 runs Apr 2025 - Mar 2026; its Q1 is Apr-Jun 2025
+    return [f"FY{key // 4}-{(key // 4 + 1) % 100:02d} Q{key % 4 + 1}" for key in keys]
+
+
+def _fiscal_year_label(keys):
+    return [f"FY{key}-{(key + 1) % 100:02d}" for key in keys]
+
+
+def window_spec(months, start_month=1):
+    """A custom bucket of `months` consecutive months, labelled by its first and last month."""
+    def label(keys):
+        start_year, start = bucket_start(keys, months, start_month)
+        last_month = (np.asarray(keys) + 1) * months + start_month - 2
+        end_year, end = last_month // 12, last_month % 12 + 1
+        return [
+            f"{MONTHS[s - 1]} {sy}-{MONTHS[e - 1]} {ey}"
+            for sy, s, ey, e in zip(start_year, start, end_year, end)
+        ]
+    return {'months': months, 'start_month': start_month, 'label': label}
+
+
+BUCKET_SPECS = {
+    'calendar_quarter': {'months': 3, 'start_month': 1, 'label': _calendar_quarter_label},
+    'half_year': {'months': 6, 'start_month': 1, 'label': _half_year_label},
+    'calendar_year': {'months': 12, 'start_month': 1, 'label': _calendar_year_label},
+    'fiscal_quarter': {'months': 3, 'start_month': 4, 'label': _fiscal_quarter_label},
+    'fiscal_year': {'months': 12, 'start_month': 4, 'label': _fiscal_year_label},
+}
+
+
+def bucket_start_keys(bucket_names, period_keys, specs=None):
+    """Month key of the first month of each (bucket type, bucket key) pair, a time axis shared by every bucket type."""
+    specs = BUCKET_SPECS if specs is None else specs
+    bucket_names = np.asarray(bucket_names)
+    period_keys = np.asarray(period_keys)
+    starts = np.empty(len(period_keys), dtype=np.int64)
+    for name, spec in specs.items():
+        is_bucket = bucket_names == name
+        starts[is_bucket] = period_keys[is_bucket] * spec['months'] + spec['start_month'] - 1
+    return starts
+
+
+def melt_months(df, id_cols, year):
+    """One year's wide monthly file (JAN..DEC columns) as long rows keyed by Month_Key."""
+    month_cols = [col for col in df.columns if col in MONTHS]
+    long_df = df.melt(id_vars=id_cols, value_vars=month_cols, var_name='Month', value_name='Registrations')
+    long_df['Month_Key'] = year * 12 + long_df['Month'].map(MONTHS.index)
+    return long_df.drop(columns='Month')
+
+
+def monthly_matrix(long_df, id_cols, value_col='Registrations'):
+    """
+    Entity x month matrix of a long monthly frame, summing duplicate (entity, month) rows.
+
+    Returns (entities, first_month_key, values, covered): `entities` holds the id columns of
+    each row, columns run over every month key from the first to the last one present, and
+    `covered` marks the months the data actually contains. Missing values are NaN.
+    """
+    sums = long_df.groupby(id_cols + ['Month_Key'])[value_col].sum(min_count=1).unstack('Month_Key')
+    first_key, last_key = int(sums.columns.min()), int(sums.columns.max())
+    covered = np.isin(np.arange(first_key, last_key + 1), long_df['Month_Key'].unique())
+    sums = sums.reindex(columns=range(first_key, last_key + 1))
+    return sums.index.to_frame(index=False), first_key, sums.to_numpy(dtype=float), covered
+
+
+def aggregate_buckets(long_df, id_cols, specs=None, value_col='Registrations'):
+    """
+    Roll a long monthly frame up into every bucket type in `specs` (default BUCKET_SPECS).
+
+    The monthly data is pivoted to one entity x month matrix once; each bucket type is then a
+    single `np.add.reduceat` over its columns. Returns {name: long frame} with the id columns,
+    Period_Key, Period (label), the summed value and Months, the number of the bucket's months
+    covered by the data (less than the bucket size for a partial period). Entities without
+    any value in a bucket get no row for it.
+    """
+    specs = BUCKET_SPECS if specs is None else specs
+    entities, first_key, values, covered = monthly_matrix(long_df, id_cols, value_col)
+    month_keys = np.arange(first_key, first_key + values.shape[1])
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0)
+
+    buckets = {}
+    for name, spec in specs.items():
+        keys = bucket_keys(month_keys, spec['months'], spec['start_month'])
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        period_keys = keys[starts]
+
+        totals = np.add.reduceat(filled, starts, axis=1)
+        totals[np.add.reduceat(present, starts, axis=1) == 0] = np.nan
+        months_covered = np.add.reduceat(covered.astype(int), starts)
+
+        bucket_df = entities.loc[entities.index.repeat(len(starts))].reset_index(drop=True)
+        bucket_df['Period_Key'] = np.tile(period_keys, len(entities))
+        bucket_df['Period'] = np.tile(spec['label'](period_keys), len(entities))
+        bucket_df[value_col] = totals.ravel()
+        bucket_df['Months'] = np.tile(months_covered, len(entities))
+        buckets[name] = bucket_df[bucket_df[value_col].notna()].reset_index(drop=True)
+    return buckets
+
+
+def compute_growth(df, group_cols, key_col='Period_Key', value_col='Registrations', growth_col='Growth_pct',
+                   months_col='Months'):
+    """
+    Percentage change versus the previous period, sorted on the integer period key.
+
+    Only reported when the previous row of the group is the immediately preceding period and,
+    if `months_col` is present, both periods cover the same number of months, so a partial
+    period is never compared with a complete one.
+    """
+    df = df.sort_values(group_cols + [key_col]).reset_index(drop=True)
+    compare_cols = [key_col, value_col] + ([months_col] if months_col in df.columns else [])
+    previous = df.groupby(group_cols)[compare_cols].shift()
+    consecutive = previous[key_col] == df[key_col] - 1
+    if months_col in df.columns:
+        consecutive &= previous[months_col] == df[months_col]
+    previous_value = previous[value_col].where(previous[value_col] != 0)
+    df[growth_col] = ((df[value_col] / previous_value - 1) * 100).where(consecutive).round(2)
+    return df
+
+
+def ytd_cube(long_df, id_cols, value_col='Registrations'):
+    """
+    Cumulative year-to-date totals of a long monthly frame for every entity, year and cutoff month.
+
+    Returns the id columns, Year, Cutoff_Month (1-12), Through_Month (label), YTD_<value_col>
+    and Prior_YTD_<value_col>, the same months' total a year earlier. Cutoffs are only listed
+    once every month of the year up to them is covered, and the prior total is NaN unless the
+    prior year's months are covered too, so each row compares like for like. Entities get a
+    row wherever either total has data.
+    """
+    entities, first_key, values, covered = monthly_matrix(long_df, id_cols, value_col)
+    first_year = first_key // 12
+    years = (first_key + values.shape[1] - 1) // 12 - first_year + 1
+
+    # Entity x year x month, padded to whole years
+    offset = first_key - first_year * 12
+    grid = np.full((len(entities), years * 12), np.nan)
+    grid[:, offset:offset + values.shape[1]] = values
+    grid = grid.reshape(len(entities), years, 12)
+    full_coverage = np.zeros(years * 12, dtype=bool)
+    full_coverage[offset:offset + len(covered)] = covered
+    full_coverage = np.logical_and.accumulate(full_coverage.reshape(years, 12), axis=1)
+
+    present = np.logical_or.accumulate(~np.isnan(grid), axis=2)
+    ytd = np.where(present, np.nancumsum(grid, axis=2), np.nan)
+    prior = np.full_like(ytd, np.nan)
+    prior[:, 1:] = np.where(full_coverage[None, :-1], ytd[:, :-1], np.nan)
+
+    keep = full_coverage[None] & (~np.isnan(ytd) | ~np.isnan(prior))
+    rows, year_index, month_index = np.nonzero(keep)
+    cube = entities.iloc[rows].reset_index(drop=True)
+    cube['Year'] = first_year + year_index
+    cube['Cutoff_Month'] = month_index + 1
+    cube['Through_Month'] = [MONTHS[month] for month in month_index]
+    cube[f'YTD_{value_col}'] = ytd[rows, year_index, month_index]
+    cube[f'Prior_YTD_{value_col}'] = prior[rows, year_index, month_index]
+    return cube
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# The pipeline modules are flat scripts in src/ that import each other as siblings
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from dashboard_data import build_snapshot
+
+
+def _write_processed(processed_dir, registrations_2022=200):
+    """Minimal processed CSVs for the dashboard loaders: two years and one quarter of one group and maker."""
+    pd.DataFrame({
+        "Group": ["2W", "2W"], "Year": [2021, 2022],
+        "Registrations": [100, registrations_2022], "YoY_pct": [None, 100.0],
+    }).to_csv(os.path.join(processed_dir, "vehicle_category_group_yoy.csv"), index=False)
+    pd.DataFrame({
+        "Maker_ID": [1, 1], "Maker": ["HERO MOTOCORP LTD"] * 2, "Year": [2021, 2022],
+        "Registrations": [100, registrations_2022], "YoY_pct": [None, 100.0],
+    }).to_csv(os.path.join(processed_dir, "maker_yoy.csv"), index=False)
+    pd.DataFrame({
+        "Group": ["2W"], "Year": [2021], "Quarter": ["Q1"], "Quarter_Key": [8084],
+        "Year_Quarter": ["2021-Q1"], "Registrations": [30.0], "Months": [3], "QoQ_pct": [None],
+    }).to_csv(os.path.join(processed_dir, "vehicle_category_quarterly_qoq.csv"), index=False)
+    pd.DataFrame({
+        "Maker_ID": [1], "Maker": ["HERO MOTOCORP LTD"], "Year": [2021], "Quarter": ["Q1"],
+        "Quarter_Key": [8084], "Year_Quarter": ["2021-Q1"], "Registrations": [30.0], "Months": [3],
+        "QoQ_pct": [None],
+    }).to_csv(os.path.join(processed_dir, "maker_quarterly_qoq.csv"), index=False)
+
+
+@pytest.fixture
+def write_processed():
+    return _write_processed
+
+
+@pytest.fixture
+def processed_dir(tmp_path):
+    """A processed directory with the minimal CSVs and a fresh snapshot of them."""
+    processed_dir = tmp_path / "processed"
+    processed_dir.mkdir()
+    _write_processed(processed_dir)
+    build_snapshot(str(processed_dir))
+    return str(processed_dir)
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from anomaly_detection import MIN_VOLUME, Z_THRESHOLD, robust_z, score_anomalies
+from time_buckets import month_key
+
+
+def series(entity, values):
+    """Long monthly rows for one maker from {(year, month): registrations}."""
+    return pd.DataFrame({
+        "Maker_ID": entity,
+        "Month_Key": [month_key(year, month) for year, month in values],
+        "Registrations": [float(value) for value in values.values()],
+    })
+
+
+def months(start_year, count, value):
+    """`count` consecutive months of `value` from January of `start_year`."""
+    return {(start_year + index // 12, index % 12 + 1): value for index in range(count)}
+
+
+def z_of(value, baseline, min_periods=1):
+    median, z = robust_z(np.array([[value]], dtype=float), np.array([[baseline]], dtype=float), min_periods)
+    return median[0, 0], z[0, 0]
+
+
+def test_robust_z_uses_the_mad():
+    median, z = z_of(20, [8, 10, 12, 10, 14])
+    assert median == 10
+    assert z == pytest.approx(10 / (1.4826 * 2))
+
+
+def test_zero_mad_falls_back_to_the_mean_absolute_deviation():
+    # Most of the baseline is identical, so the MAD is 0 but the baseline still varies
+    median, z = z_of(20, [10, 10, 10, 16])
+    assert median == 10
+    assert z == pytest.approx(10 / (1.2533 * 1.5))
+
+
+def test_constant_baseline_scale_is_floored_at_one_registration():
+    assert z_of(13, [10, 10, 10])[1] == 3.0
+    assert z_of(10, [10, 10, 10])[1] == 0.0
+
+
+def test_baseline_shorter_than_min_periods_has_no_score():
+    median, z = z_of(100, [10, np.nan, np.nan], min_periods=2)
+    assert np.isnan(median) and np.isnan(z)
+    assert z_of(100, [10, 10, np.nan], min_periods=2)[1] == 90.0
+
+
+def flagged_months(long_df, **kwargs):
+    anomalies = score_anomalies(long_df, ["Maker_ID"], **kwargs)
+    return list(zip(anomalies["Year"], anomalies["Month"]))
+
+
+def test_seasonal_baseline_needs_two_prior_years():
+    # Only January is reported, so there is never a trailing window
+    one_year = series(1, {(2023, 1): 100, (2024, 1): 400})
+    two_years = series(1, {(2022, 1): 100, (2023, 1): 100, (2024, 1): 400})
+    assert flagged_months(one_year) == []
+    assert flagged_months(two_years) == [(2024, "JAN")]
+    anomalies = score_anomalies(two_years, ["Maker_ID"])
+    assert np.isnan(anomalies.loc[0, "Trailing_z"])
+    assert anomalies.loc[0, "Score"] == anomalies.loc[0, "Seasonal_z"]
+
+
+def test_trailing_window_needs_three_months():
+    # A new maker without any prior year: only the trailing window can score it
+    two_months = series(1, {(2024, 1): 100, (2024, 2): 100, (2024, 3): 400})
+    three_months = series(1, {(2024, 1): 100, (2024, 2): 100, (2024, 3): 100, (2024, 4): 400})
+    assert flagged_months(two_months) == []
+    assert flagged_months(three_months) == [(2024, "APR")]
+    anomalies = score_anomalies(three_months, ["Maker_ID"])
+    assert np.isnan(anomalies.loc[0, "Seasonal_z"])
+    assert anomalies.loc[0, "Direction"] == "spike"
+
+
+def test_seasonal_peak_is_not_flagged_against_quieter_trailing_months():
+    # Every October is four times the rest of the year
+    values = months(2021, 46, 100)
+    for year in (2021, 2022, 2023, 2024):
+        values[(year, 10)] = 400
+    # Until two prior Octobers exist the trailing window alone decides, and flags the peak
+    assert flagged_months(series(1, values)) == [(2022, "OCT"), (2021, "OCT")]
+
+
+def test_drop_flagged_when_both_baselines_agree():
+    values = months(2021, 48, 1000)
+    values[(2024, 12)] = 100
+    anomalies = score_anomalies(series(1, values), ["Maker_ID"])
+    assert list(zip(anomalies["Year"], anomalies["Month"])) == [(2024, "DEC")]
+    assert anomalies.loc[0, "Direction"] == "drop"
+    assert anomalies.loc[0, "Score"] <= -Z_THRESHOLD
+
+
+def test_small_volumes_are_never_flagged():
+    # Scale is floored at one registration, so these are huge z-scores either way
+    below = months(2021, 47, 5)
+    below[(2024, 12)] = MIN_VOLUME - 1
+    at = months(2021, 47, 5)
+    at[(2024, 12)] = MIN_VOLUME
+    assert flagged_months(series(1, below)) == []
+    assert flagged_months(series(1, at)) == [(2024, "DEC")]
+    drop_from = months(2021, 47, MIN_VOLUME)
+    drop_from[(2024, 12)] = 0
+    assert flagged_months(series(1, drop_from)) == [(2024, "DEC")]
+
+
+def test_month_keys_limit_scoring_to_those_months():
+    values = months(2021, 48, 100)
+    values[(2023, 6)] = 900
+    values[(2024, 12)] = 900
+    long_df = series(1, values)
+    assert flagged_months(long_df) == [(2024, "DEC"), (2023, "JUN")]
+    # As the pipelines store them: oldest month first, so new months append
+    assert flagged_months(long_df, recent_first=False) == [(2023, "JUN"), (2024, "DEC")]
+    assert flagged_months(long_df, month_keys=[month_key(2024, 12)]) == [(2024, "DEC")]
@@ -0,0 +1,87 @@
+import os
+
+import pandas as pd
+import pytest
+
+import batch_reports
+from batch_reports import _report_filename, default_report_specs, render_report_html
+from dashboard_data import load_dashboard_data
+from snapshot import snapshot_path
+
+
+def test_default_specs_cover_every_group_top_maker_and_window():
+    vc = pd.DataFrame({"Group": ["2W", "4W"] * 4, "Year": [2021, 2021, 2022, 2022, 2023, 2023, 2024, 2024]})
+    maker = pd.DataFrame({
+        "Maker_ID": [1, 2, 3, 1, 2, 3], "Maker": ["A", "B", "C", "A", "B", "C"],
+        "Year": [2023, 2023, 2023, 2024, 2024, 2024], "Registrations": [50, 90, 10, 60, 80, 5],
+    })
+    specs = default_report_specs((vc, maker, None, None), top_n=2, window_sizes=(1, 3))
+    assert len(specs) == 2 * 2 * 2
+    assert {(spec["categories"][0], spec["makers"][0]) for spec in specs} == {
+        ("2W", 2), ("2W", 1), ("4W", 2), ("4W", 1),
+    }
+    assert specs[0] == {
+        "name": "2W_maker2_2024-2024", "title": "2W | B | 2024-2024",
+        "years": [2024], "categories": ["2W"], "makers": [2],
+    }
+    assert specs[1]["years"] == [2022, 2023, 2024]
+
+
+def test_report_filename_is_sanitised():
+    assert _report_filename({"name": "2W/3W maker 1: 2021-2025"}) == "2W_3W_maker_1_2021-2025.html"
+
+
+@pytest.fixture
+def frames(processed_dir):
+    return load_dashboard_data(processed_dir)[0]
+
+
+def test_report_has_metrics_and_charts_without_inline_plotly_js(frames):
+    page = render_report_html({"name": "2W", "title": "2W & Hero", "years": [2021, 2022], "categories": ["2W"],
+                               "makers": [1]}, frames)
+    assert "<title>2W &amp; Hero</title>" in page
+    assert '<script src="plotly.min.js"></script>' in page
+    assert "Total Registrations" in page and "Best Performer" in page
+    # Four vehicle-category charts and three maker charts, none carrying the plotly.js bundle
+    assert page.count('<div class="chart">') == 7
+    assert "plotly.js v" not in page and len(page) < 500_000
+
+
+def test_fragment_cache_reuses_sections_only_for_equal_filters(frames, monkeypatch):
+    calls = []
+    for name in ("_vehicle_section", "_maker_section"):
+        section = getattr(batch_reports, name)
+
+        def counted(filtered, name=name, section=section):
+            calls.append(name)
+            return section(filtered)
+
+        monkeypatch.setattr(batch_reports, name, counted)
+
+    cache = {}
+
+    def render(years, categories, makers):
+        render_report_html({"name": "r", "years": years, "categories": categories, "makers": makers}, frames, cache)
+
+    render([2021, 2022], ["2W"], [1])
+    assert calls == ["_vehicle_section", "_maker_section"]
+    # Another maker reuses the vehicle section, another category the maker section
+    render([2021, 2022], ["2W"], [2])
+    render([2021, 2022], ["3W"], [1])
+    assert calls == ["_vehicle_section", "_maker_section", "_maker_section", "_vehicle_section"]
+    # Different years share neither
+    render([2022], ["2W"], [1])
+    assert calls[4:] == ["_vehicle_section", "_maker_section"]
+    assert len(cache) == 6
+
+
+def test_workers_load_the_snapshot_rather_than_the_csvs(processed_dir, write_processed, monkeypatch):
+    # A CSV rewritten but backdated before the snapshot leaves the snapshot fresh, so it is what is loaded
+    write_processed(processed_dir, registrations_2022=250)
+    snapshot_time = os.path.getmtime(snapshot_path(processed_dir))
+    for name in os.listdir(processed_dir):
+        if name.endswith(".csv"):
+            os.utime(os.path.join(processed_dir, name), (snapshot_time - 60, snapshot_time - 60))
+    monkeypatch.setattr(batch_reports, "_FRAMES", None)
+    batch_reports._init_worker(processed_dir)
+    assert batch_reports._FRAMES[0]["Registrations"].tolist() == [100, 200]
@@ -0,0 +1,126 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard_data import (
+    apply_ytd_yoy, filter_data, latest_performers, read_processed_data, session_views, yoy_caption,
+)
+
+
+@pytest.fixture
+def shared():
+    vc = pd.DataFrame({
+        "Group": ["2W", "2W", "4W"], "Year": [2023, 2024, 2024],
+        "Registrations": [100, 120, 50], "YoY_pct": [np.nan, 20.0, np.nan],
+    })
+    maker = pd.DataFrame({
+        "Maker_ID": [1, 1, 2], "Maker": ["A", "A", "B"], "Year": [2023, 2024, 2024],
+        "Registrations": [10, 12, 5], "YoY_pct": [np.nan, 20.0, np.nan],
+    })
+    vc_qoq = pd.DataFrame({
+        "Group": ["2W"], "Year": [2024], "Quarter": ["Q1"], "Registrations": [30.0], "QoQ_pct": [5.0],
+    })
+    maker_qoq = pd.DataFrame({
+        "Maker_ID": [1], "Maker": ["A"], "Year": [2024], "Quarter": ["Q1"], "Registrations": [3.0], "QoQ_pct": [5.0],
+    })
+    frames = (vc, maker, vc_qoq, maker_qoq)
+    extras = {"maker_share_yearly": pd.DataFrame({"Maker_ID": [1, 2], "Year": [2024, 2024], "Share_pct": [70.0, 30.0]})}
+    return frames, extras, ([df.copy() for df in frames], {name: df.copy() for name, df in extras.items()})
+
+
+def assert_unchanged(frames, extras, originals):
+    for df, original in zip(frames, originals[0]):
+        pd.testing.assert_frame_equal(df, original)
+    for name, df in extras.items():
+        pd.testing.assert_frame_equal(df, originals[1][name])
+
+
+def test_session_views_share_data_without_copying(shared):
+    frames, extras, _ = shared
+    views, extra_views = session_views(frames, extras)
+    assert np.shares_memory(views[0]["Registrations"].to_numpy(), frames[0]["Registrations"].to_numpy())
+    assert np.shares_memory(
+        extra_views["maker_share_yearly"]["Share_pct"].to_numpy(), extras["maker_share_yearly"]["Share_pct"].to_numpy()
+    )
+
+
+def test_session_writes_leave_shared_frames_unchanged(shared):
+    frames, extras, originals = shared
+    views, extra_views = session_views(frames, extras)
+    vc, maker, vc_qoq, _ = views
+    vc["Registrations"] = 0
+    vc["Label"] = "x"
+    maker.loc[maker["Maker_ID"] == 1, "Registrations"] = -1
+    maker.iloc[0, maker.columns.get_loc("Maker")] = "Z"
+    vc_qoq.fillna(0, inplace=True)
+    vc_qoq.sort_values("Registrations", inplace=True)
+    extra_views["maker_share_yearly"].loc[:, "Share_pct"] *= 2
+    assert_unchanged(frames, extras, originals)
+
+
+def test_session_views_expose_read_only_arrays(shared):
+    frames, extras, originals = shared
+    views, _ = session_views(frames, extras)
+    with pytest.raises(ValueError):
+        views[0]["Registrations"].to_numpy()[0] = 0
+    with pytest.raises(ValueError):
+        views[1]["Registrations"].values[0] = 0
+    views[1].values[0, 3] = 0  # a mixed-dtype frame's values are already a fresh copy
+    assert_unchanged(frames, extras, originals)
+
+
+def test_filtering_session_views_leaves_shared_frames_unchanged(shared):
+    frames, extras, originals = shared
+    views, _ = session_views(frames, extras)
+    filtered = filter_data(*views, years=[2024], categories=["2W"], makers=[1])
+    filtered["vc"]["Registrations"] += 1
+    filtered["maker"]["YoY_pct"] = filtered["maker"]["YoY_pct"].fillna(0)
+    filtered["maker_qoq"].loc[:, "QoQ_pct"] = 0.0
+    assert_unchanged(frames, extras, originals)
+
+
+def ytd_cube_through(months, partial_month=False):
+    """2W and 4W YTD cube rows for 2025 through `months`, optionally with the last one flagged partial."""
+    return pd.DataFrame([
+        {"Group": group, "Year": 2025, "Cutoff_Month": month, "Through_Month": ["JAN", "FEB", "MAR"][month - 1],
+         "YTD_YoY_pct": yoy + month, "Partial_Month": partial_month and month == months}
+        for group, yoy in (("2W", 10.0), ("4W", -20.0)) for month in range(1, months + 1)
+    ])
+
+
+def yearly_vc():
+    return pd.DataFrame({
+        "Group": ["2W", "2W", "4W", "4W"], "Year": [2024, 2025, 2024, 2025],
+        "Registrations": [100, 40, 50, 10], "YoY_pct": [5.0, -60.0, 2.0, -80.0],
+    })
+
+
+def test_partial_year_gets_a_comparable_yoy_and_keeps_the_file_yoy():
+    vc = apply_ytd_yoy(yearly_vc(), ytd_cube_through(3, partial_month=True), "Group")
+    # The flagged MAR cutoff is skipped for the last complete one
+    assert vc["YoY_pct"].tolist() == [5.0, -60.0, 2.0, -80.0]
+    assert vc["Comparable_YoY_pct"].tolist() == [5.0, 12.0, 2.0, -18.0]
+    assert vc["YoY_basis"].tolist() == ["Full year", "YTD JAN-FEB", "Full year", "YTD JAN-FEB"]
+    best, worst = latest_performers(vc)
+    assert (best["Group"], worst["Group"]) == ("2W", "4W")
+    assert yoy_caption(best) == "12.0% YoY, YTD JAN-FEB"
+
+
+def test_without_a_partial_year_comparable_yoy_is_the_file_yoy():
+    vc = apply_ytd_yoy(yearly_vc(), None, "Group")
+    pd.testing.assert_series_equal(vc["Comparable_YoY_pct"], vc["YoY_pct"], check_names=False)
+    assert (vc["YoY_basis"] == "Full year").all()
+    assert yoy_caption(vc.iloc[1]) == "-60.0% YoY"
+
+
+def test_read_processed_data_leaves_the_file_yoy_as_written(processed_dir):
+    cube = ytd_cube_through(2).rename(columns={"Group": "Maker_ID"})
+    cube["Maker_ID"] = cube["Maker_ID"].map({"2W": 1, "4W": 2})
+    cube["Year"] = 2022
+    cube.to_csv(os.path.join(processed_dir, "maker_ytd_cube.csv"), index=False)
+    on_disk = pd.read_csv(os.path.join(processed_dir, "maker_yoy.csv"))
+    maker = read_processed_data(processed_dir)[1]
+    pd.testing.assert_series_equal(maker["YoY_pct"], on_disk["YoY_pct"])
+    assert maker["Comparable_YoY_pct"].tolist()[1] == 12.0
@@ -0,0 +1,35 @@
+import plotly.graph_objects as go
+
+import figure_cache
+from figure_cache import cache_key, cached_figure
+
+
+def build_counter():
+    calls = []
+
+    def build():
+        calls.append(1)
+        return go.Figure(go.Scatter(x=[1, 2], y=[3, 4]))
+
+    return build, calls
+
+
+def test_cached_figure_is_built_once_per_version(tmp_path):
+    build, calls = build_counter()
+    first = cached_figure(str(tmp_path), "view", {"years": [2024]}, build, version=1)
+    again = cached_figure(str(tmp_path), "view", {"years": [2024]}, build, version=1)
+    assert first == again
+    assert len(calls) == 1
+    cached_figure(str(tmp_path), "view", {"years": [2024]}, build, version=2)
+    cached_figure(str(tmp_path), "view", {"years": [2025]}, build, version=2)
+    assert len(calls) == 3
+
+
+def test_figure_code_change_invalidates_cached_figures(tmp_path, monkeypatch):
+    build, calls = build_counter()
+    key = cache_key("view", {"years": [2024]}, 1)
+    cached_figure(str(tmp_path), "view", {"years": [2024]}, build, version=1)
+    monkeypatch.setattr(figure_cache, "FIGURE_CODE_VERSION", "changed")
+    assert cache_key("view", {"years": [2024]}, 1) != key
+    cached_figure(str(tmp_path), "view", {"years": [2024]}, build, version=1)
+    assert len(calls) == 2
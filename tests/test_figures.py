@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from figures import OTHERS_MAKER_ID, TOP_K_TRACES, maker_qoq_figure, rollup_others
+
+QUARTERS = [(8096, "2024-Q1", 3), (8097, "2024-Q2", 3), (8098, "2024-Q3", 3), (8099, "2024-Q4", 1)]
+
+
+def maker_quarters(makers=12):
+    """Quarterly maker rows where maker 1 is the largest; the last quarter only covers one month."""
+    rows = []
+    for maker_id in range(1, makers + 1):
+        for index, (key, label, months) in enumerate(QUARTERS):
+            registrations = (makers + 1 - maker_id) * 100 + (maker_id % 3) * 40 * index
+            rows.append({
+                "Maker_ID": maker_id, "Maker": f"MAKER {maker_id}", "Quarter_Key": key,
+                "Year_Quarter": label, "Months": months, "Registrations": float(registrations),
+                # A per-maker QoQ that must not leak into the Others trace
+                "QoQ_pct": 999.0,
+            })
+    return pd.DataFrame(rows)
+
+
+def test_makers_beyond_top_k_are_summed_into_others():
+    quarterly = maker_quarters()
+    rolled = rollup_others(quarterly, ["Quarter_Key", "Year_Quarter", "Months"], ["Registrations"], top_k=8)
+    others = rolled[rolled["Maker_ID"] == OTHERS_MAKER_ID].sort_values("Quarter_Key")
+    assert rolled["Maker_ID"].nunique() == 9
+    assert others["Maker"].unique().tolist() == ["Others (4)"]
+    expected = quarterly[quarterly["Maker_ID"] > 8].groupby("Quarter_Key")["Registrations"].sum()
+    assert others["Registrations"].tolist() == expected.tolist()
+    assert rollup_others(quarterly, ["Quarter_Key"], ["Registrations"], top_k=12) is quarterly
+
+
+def test_others_qoq_comes_from_the_summed_registrations():
+    quarterly = maker_quarters()
+    fig = maker_qoq_figure(quarterly)
+    assert len(fig.data) == TOP_K_TRACES + 1
+
+    others = next(trace for trace in fig.data if trace.name.startswith("Others"))
+    summed = quarterly[quarterly["Maker_ID"] > TOP_K_TRACES].groupby("Quarter_Key")["Registrations"].sum().tolist()
+    assert list(others.x) == ["2024-Q1", "2024-Q2", "2024-Q3", "2024-Q4"]
+    assert np.isnan(others.y[0])
+    assert others.y[1:3].tolist() == pytest.approx([
+        round((summed[1] / summed[0] - 1) * 100, 2), round((summed[2] / summed[1] - 1) * 100, 2),
+    ])
+    # Q4 covers one month against Q3's three, so it gets no growth
+    assert np.isnan(others.y[3])
+    # The top makers keep their own QoQ
+    top = next(trace for trace in fig.data if trace.name == "MAKER 1")
+    assert list(top.y) == [999.0] * 4
@@ -0,0 +1,166 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from incremental_update import patch_rank_movement, read_months, unchanged_prefix, update_monthly_data, write_patched
+from monthly_data_processing import load_monthly_csv, process_monthly_data, quarterly_rank_movement, vc_monthly_rows
+from time_buckets import MONTHS, month_key
+
+VEHICLE_CATEGORIES = ["TWO WHEELER(NT)", "THREE WHEELER(T)", "LIGHT MOTOR VEHICLE", "HEAVY GOODS VEHICLE", "AGRICULTURAL TRACTOR"]
+MAKERS = [f"MAKER {letter} PVT LTD" for letter in "ABCDEFGHIJKL"]
+
+
+def synthetic_quarterly(seed=7, makers=80, first_key=8084, last_key=8102):
+    """Maker quarterly rows with ties, gaps, late entrants and makers that stop reporting."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for maker_id in range(1, makers + 1):
+        start = first_key + int(rng.integers(0, 6)) if maker_id % 5 == 0 else first_key
+        stop = last_key - int(rng.integers(0, 4)) if maker_id % 7 == 0 else last_key
+        for key in range(start, stop + 1):
+            if rng.random() < 0.05:
+                continue
+            rows.append({
+                "Maker_ID": maker_id, "Maker": f"MAKER {maker_id}", "Year": key // 4,
+                "Quarter": f"Q{key % 4 + 1}", "Quarter_Key": key, "Year_Quarter": f"{key // 4}-Q{key % 4 + 1}",
+                # A coarse grid of values so that ranks tie regularly
+                "Registrations": float(rng.integers(0, 40) * 50),
+            })
+    return pd.DataFrame(rows)
+
+
+def assert_same_rows(left, right, sort_cols):
+    left = left.sort_values(sort_cols).reset_index(drop=True)
+    right = right.sort_values(sort_cols).reset_index(drop=True)
+    pd.testing.assert_frame_equal(left, right, check_dtype=False)
+
+
+@pytest.mark.parametrize("seed", [7, 11, 23])
+def test_patched_rank_movement_equals_full_rebuild(seed):
+    quarterly = synthetic_quarterly(seed)
+    last_key = quarterly["Quarter_Key"].max()
+
+    # Before the update the last quarter was partial and the one before it the latest complete one
+    before = quarterly[quarterly["Quarter_Key"] < last_key].copy()
+    partial = before["Quarter_Key"] == last_key - 1
+    before.loc[partial, "Registrations"] = (before.loc[partial, "Registrations"] // 3).round()
+    ranks, movers = quarterly_rank_movement(before)
+
+    patched_ranks, patched_movers = patch_rank_movement(ranks, movers, quarterly, [last_key - 1, last_key])
+    full_ranks, full_movers = quarterly_rank_movement(quarterly)
+
+    assert_same_rows(patched_ranks, full_ranks, ["Quarter_Key", "Rank", "Maker_ID"])
+    assert_same_rows(patched_movers, full_movers, ["Quarter_Key", "Comparison", "Direction", "Position"])
+    assert set(full_movers["Quarter_Key"]) >= {last_key - 1, last_key}
+
+
+def write_monthly_files(monthly_data_dir, year, months):
+    """
+    The year's VC and MAKER files with its first `months` months, as monthly_data_cleaning writes them.
+    The values only depend on the year, month and row, so a shorter file is a prefix of a longer one.
+    """
+    os.makedirs(monthly_data_dir, exist_ok=True)
+    rng = np.random.default_rng(year)
+    for kind, name_col, names, scale in (("VC", "Vehicle Category", VEHICLE_CATEGORIES, 100000),
+                                         ("MAKER", "Maker", MAKERS, 5000)):
+        values = rng.integers(scale // 10, scale, size=(len(names), 12)).astype(float)
+        values[-1, :5] = np.nan  # the last row only starts reporting in June
+        values[0] *= np.linspace(1, 1.5, 12)  # and the first grows steadily
+        df = pd.DataFrame(values[:, :months].round(), columns=MONTHS[:months])
+        df.insert(0, name_col, names)
+        df.insert(0, "S No", range(1, len(names) + 1))
+        df["TOTAL"] = df[MONTHS[:months]].sum(axis=1)
+        df.to_csv(os.path.join(monthly_data_dir, f"{year}_monthly_{kind}.csv"), index=False)
+
+
+def processed_outputs(processed_dir):
+    return {
+        name: pd.read_csv(os.path.join(processed_dir, name))
+        for name in sorted(os.listdir(processed_dir))
+        if name.endswith(".csv") and name != "maker_dictionary.csv"
+    }
+
+
+def build(root, files):
+    """Write the monthly `files` ({year: months}) under `root` and run the full monthly rebuild."""
+    monthly_data_dir = os.path.join(root, "monthly")
+    for year, months in files.items():
+        write_monthly_files(monthly_data_dir, year, months)
+    process_monthly_data(monthly_data_dir)
+    return monthly_data_dir
+
+
+def assert_incremental_matches_full(tmp_path, before, after):
+    full_dir = build(tmp_path / "full", after)
+    incremental_dir = build(tmp_path / "incremental", before)
+    for year, months in after.items():
+        write_monthly_files(incremental_dir, year, months)
+    assert update_monthly_data(incremental_dir)
+
+    full_processed = os.path.join(os.path.dirname(full_dir), "processed")
+    incremental_processed = os.path.join(os.path.dirname(incremental_dir), "processed")
+    full = processed_outputs(full_processed)
+    incremental = processed_outputs(incremental_processed)
+    assert set(incremental) == set(full)
+    for name, df in full.items():
+        pd.testing.assert_frame_equal(incremental[name], df, check_dtype=False, obj=name)
+        # The rewritten tails are formatted exactly as a full write would format them
+        with open(os.path.join(full_processed, name), "rb") as a, open(os.path.join(incremental_processed, name), "rb") as b:
+            assert a.read() == b.read(), name
+    return full
+
+
+def test_incremental_update_after_appending_a_month_equals_full_rebuild(tmp_path):
+    full = assert_incremental_matches_full(tmp_path, {2023: 12, 2024: 12, 2025: 7}, {2023: 12, 2024: 12, 2025: 8})
+    assert full["maker_quarterly_qoq.csv"]["Year_Quarter"].max() == "2025-Q3"
+
+
+def test_incremental_update_after_appending_a_new_year_equals_full_rebuild(tmp_path):
+    # Years past the old hard-coded 2021-2025 range must be picked up by both paths
+    full = assert_incremental_matches_full(
+        tmp_path, {2024: 12, 2025: 12}, {2024: 12, 2025: 12, 2026: 2}
+    )
+    assert full["vehicle_category_quarterly_qoq.csv"]["Year_Quarter"].max() == "2026-Q1"
+    assert 2026 in full["maker_ytd_cube.csv"]["Year"].tolist()
+
+
+def test_read_months_matches_the_full_rebuild_rows(tmp_path):
+    monthly_data_dir = str(tmp_path / "monthly")
+    write_monthly_files(monthly_data_dir, 2024, 12)
+    write_monthly_files(monthly_data_dir, 2025, 8)
+    keys = [month_key(2024, 11), month_key(2024, 12), month_key(2025, 8), month_key(2025, 9)]
+
+    rows = read_months(monthly_data_dir, "VC", keys, str(tmp_path / "maker_dictionary.csv"))
+    expected = pd.concat([
+        vc_monthly_rows(load_monthly_csv(os.path.join(monthly_data_dir, f"{year}_monthly_VC.csv")), year)
+        for year in (2024, 2025)
+    ])
+    expected = expected[expected["Month_Key"].isin(keys)]
+    sort_cols = ["Group", "Vehicle Category", "Month_Key"]
+    pd.testing.assert_frame_equal(
+        rows.sort_values(sort_cols).reset_index(drop=True), expected.sort_values(sort_cols).reset_index(drop=True),
+        check_dtype=False,
+    )
+    # The partial year's TOTAL column is never read as a month
+    assert sorted(rows["Month_Key"].unique()) == keys[:3]
+
+
+def test_unchanged_prefix_treats_nan_as_equal():
+    old = pd.DataFrame({"Key": [1, 2, 3], "Value": [1.0, np.nan, 3.0]})
+    assert unchanged_prefix(old, old.copy()) == 3
+    assert unchanged_prefix(old, pd.DataFrame({"Key": [1, 2, 4, 5], "Value": [1.0, np.nan, 3.0, 5.0]})) == 2
+    assert unchanged_prefix(old, pd.DataFrame({"Key": [1, 2, 3, 4], "Value": [1.0, np.nan, 3.0, 4.0]})) == 3
+    assert unchanged_prefix(old, old.rename(columns={"Value": "Other"})) == 0
+
+
+def test_write_patched_only_rewrites_the_rows_after_the_unchanged_start(tmp_path):
+    path = tmp_path / "table.csv"
+    # Formatted unlike to_csv ("1.50", CRLF) so that a rewritten row would show
+    path.write_bytes(b"Key,Maker,Value\r\n1,\"A, B\",1.50\r\n2,C,\r\n3,D,3.50\r\n")
+    old = pd.read_csv(path)
+    new = pd.DataFrame({"Key": [1, 2, 3, 4], "Maker": ["A, B", "C", "D", "E"], "Value": [1.5, np.nan, 4.0, 5.0]})
+    write_patched(str(path), old, new)
+    assert path.read_bytes() == b"Key,Maker,Value\r\n1,\"A, B\",1.50\r\n2,C,\r\n3,D,4.0\r\n4,E,5.0\r\n"
+    pd.testing.assert_frame_equal(pd.read_csv(path), new)
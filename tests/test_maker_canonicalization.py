@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+from maker_canonicalization import (
+    canonicalize_makers,
+    clean_maker_name,
+    load_maker_dictionary,
+    maker_match_key,
+    resolve_key_clusters,
+    update_maker_dictionary,
+)
+
+
+def test_clean_maker_name_strips_quotes_and_whitespace():
+    assert clean_maker_name('"""VOLVO GROUP INDIA PVT LTD"""') == "VOLVO GROUP INDIA PVT LTD"
+    assert clean_maker_name("  bajaj   auto ltd ") == "BAJAJ AUTO LTD"
+
+
+@pytest.mark.parametrize("a, b", [
+    ("SPEEGO VEHICLES CO PVT LTD", "SPEEGO VEHICLES PVT. LTD"),
+    ("M/S. KINETIC GREEN ENERGY PRIVATE LIMITED", "KINETIC GREEN ENERGY PVT LTD"),
+    ("MAHINDRA & MAHINDRA LIMITED", "MAHINDRA AND MAHINDRA LTD"),
+    ("A.K.AUTO ELECTRICAL", "A K AUTO ELECTRICAL"),
+])
+def test_match_key_normalizes_legal_forms_and_punctuation(a, b):
+    assert maker_match_key(a) == maker_match_key(b)
+
+
+def test_match_key_keeps_legal_words_inside_the_name():
+    assert maker_match_key("TATA MOTORS LTD") == "TATA MOTORS"
+    assert maker_match_key("CO OPERATIVE MOTORS LTD") == "CO OPERATIVE MOTORS"
+
+
+def _merged(a, b):
+    keys = {maker_match_key(a), maker_match_key(b)}
+    clusters = resolve_key_clusters(keys)
+    return len(set(clusters.values())) == 1
+
+
+# Variants found in the Vahan files that must collapse onto one maker
+@pytest.mark.parametrize("a, b", [
+    ("HERO ELECTRIC VEHICLE PVT LTD", "HERO ELECTRIC VEHICLES PVT. LTD"),
+    ("PASHUPATI VEHICLE PVT. LTD.", "PASHUPATI VEHICLES PVT LTD"),
+    ("SHAKTI ENGINEERING WORK", "SHAKTI ENGINEERING WORKS"),
+    ("VANDANA TRAILERS AND BODY MFG PVT LTD", "VANDANA TRAILORS AND BODY MFG PVT LTD"),
+    ("XXPLORE AUTOMATIVE PVT LTD", "XXPLORE AUTOMOTIVE PVT. LIMITED"),
+    ("A B EXCAVATORS & EARTHMOVER LTD", "A B EXCAVATORS & EARTHMOVERS PVT LTD"),
+])
+def test_known_variants_merge(a, b):
+    assert _merged(a, b)
+
+
+# Distinct makers that share a first token or differ by an initial or number
+@pytest.mark.parametrize("a, b", [
+    ("TATA MOTORS LTD", "TATA MOTORS PASSENGER VEHICLES LTD"),
+    ("MAHINDRA & MAHINDRA LIMITED", "MAHINDRA ELECTRIC MOBILITY LIMITED"),
+    ("MAHINDRA LAST MILE MOBILITY LTD", "MAHINDRA ELECTRIC MOBILITY LTD"),
+    ("A K AUTO ELECTRICAL", "A B AUTO ELECTRICAL"),
+    ("SHIVAM AUTOTECH 1", "SHIVAM AUTOTECH 2"),
+    ("HERO MOTOCORP LTD", "HERO ELECTRIC VEHICLES PVT LTD"),
+    ("SKODA AUTO INDIA PVT LTD", "SKODA AUTO VOLKSWAGEN INDIA PVT LTD"),
+])
+def test_distinct_makers_do_not_merge(a, b):
+    assert not _merged(a, b)
+
+
+def test_dictionary_keeps_ids_and_assigns_new_ones(tmp_path):
+    path = tmp_path / "maker_dictionary.csv"
+    first = canonicalize_makers(pd.DataFrame({"Maker": ["HERO MOTOCORP LTD", "BAJAJ AUTO LTD"]}), path)
+    ids = dict(zip(first["Maker"], first["Maker_ID"]))
+
+    second = canonicalize_makers(
+        pd.DataFrame({"Maker": ['"BAJAJ AUTO LIMITED"', "HERO MOTOCORP LTD", "TVS MOTOR COMPANY LTD"]}), path
+    )
+    assert second["Maker_ID"].tolist()[:2] == [ids["BAJAJ AUTO LTD"], ids["HERO MOTOCORP LTD"]]
+    assert second["Maker"].iloc[0] == "BAJAJ AUTO LTD"
+    assert second["Maker_ID"].iloc[2] == max(ids.values()) + 1
+    assert len(load_maker_dictionary(path)) == 4
+
+
+def test_update_is_a_no_op_for_known_aliases():
+    dictionary = update_maker_dictionary(load_maker_dictionary("missing.csv"), ["HERO MOTOCORP LTD"])
+    assert update_maker_dictionary(dictionary, ["HERO MOTOCORP LTD"]) is dictionary
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_metrics import compute_concentration, compute_market_share, compute_rank_movement, rank_periods, top_movers
+
+
+def test_ties_share_the_best_rank_and_nan_stays_unranked():
+    values = np.array([
+        [10.0, 5.0],
+        [10.0, np.nan],
+        [7.0, 5.0],
+        [3.0, 9.0],
+    ])
+    ranks = rank_periods(values)
+    assert ranks[:, 0].tolist() == [1, 1, 3, 4]
+    assert ranks[[0, 2, 3], 1].tolist() == [2, 2, 1]
+    assert np.isnan(ranks[1, 1])
+
+
+def ranked(rows, lags=None):
+    """Rank movement of (Maker_ID, Quarter_Key, Registrations) rows."""
+    long_df = pd.DataFrame(rows, columns=["Maker_ID", "Quarter_Key", "Registrations"])
+    long_df["Maker"] = "M" + long_df["Maker_ID"].astype(str)
+    return compute_rank_movement(long_df, "Quarter_Key", lags or {"QoQ": 1, "YoY": 4})
+
+
+def rank_of(ranks, maker_id, key, col="Rank"):
+    return ranks[(ranks["Maker_ID"] == maker_id) & (ranks["Quarter_Key"] == key)][col].iloc[0]
+
+
+def test_first_period_has_no_rank_change():
+    ranks = ranked([(1, 100, 50), (2, 100, 40), (1, 101, 30), (2, 101, 60)])
+    assert ranks[ranks["Quarter_Key"] == 100][["Rank_change_QoQ", "Rank_change_YoY"]].isna().all().all()
+    assert rank_of(ranks, 2, 101, "Rank_change_QoQ") == 1
+    assert rank_of(ranks, 1, 101, "Rank_change_QoQ") == -1
+    assert ranks["Rank_change_YoY"].isna().all()
+
+
+def test_missing_previous_period_gives_no_rank_change():
+    # Key 101 has no rows at all, so nothing is compared with it
+    ranks = ranked([(1, 100, 50), (2, 100, 40), (1, 102, 30), (2, 102, 60)])
+    assert ranks[ranks["Quarter_Key"] == 102]["Rank_change_QoQ"].isna().all()
+
+
+def test_entering_and_zero_registration_makers():
+    ranks = ranked([(1, 100, 50), (2, 100, 0), (1, 101, 30), (2, 101, 60), (3, 101, 45)])
+    # A zero month is not ranked, so maker 2 enters in 101 without a previous rank
+    assert ((ranks["Maker_ID"] == 2) & (ranks["Quarter_Key"] == 100)).sum() == 0
+    assert np.isnan(rank_of(ranks, 2, 101, "Rank_change_QoQ"))
+    assert np.isnan(rank_of(ranks, 3, 101, "Rank_change_QoQ"))
+    assert rank_of(ranks, 1, 101, "Rank") == 3
+
+
+def test_yoy_rank_change_reads_the_same_quarter_a_year_earlier():
+    rows = [(maker, key, 100 - maker) for maker in (1, 2, 3) for key in range(100, 104)]
+    rows += [(1, 104, 10), (2, 104, 20), (3, 104, 30)]
+    ranks = ranked(rows)
+    assert [rank_of(ranks, maker, 104, "Rank_change_YoY") for maker in (1, 2, 3)] == [-2, 0, 2]
+
+
+def market(previous, current):
+    """Two quarters where each maker has the given rank: {maker_id: rank} per quarter."""
+    rows = [(maker, 100, 1000 - rank) for maker, rank in previous.items()]
+    rows += [(maker, 101, 1000 - rank) for maker, rank in current.items()]
+    return ranked(rows, {"QoQ": 1})
+
+
+def filler(first, last, offset=0):
+    return {1000 + rank: rank + offset for rank in range(first, last + 1)}
+
+
+def test_movers_include_makers_entering_or_leaving_the_top_ranks():
+    previous = {1: 60, 2: 45, 3: 70, **filler(1, 44), **filler(46, 59), **filler(61, 69), **filler(71, 80)}
+    current = {1: 40, 2: 70, 3: 55, **filler(1, 39), **filler(41, 54), **filler(56, 69), **filler(71, 80)}
+    assert sorted(previous.values()) == list(range(1, 81)) and sorted(current.values()) == list(range(1, 81))
+    movers = top_movers(market(previous, current), "Quarter_Key", ["QoQ"], top_n=10, max_rank=50)
+    gainers = movers[movers["Direction"] == "Gainer"]
+    losers = movers[movers["Direction"] == "Loser"]
+    # Maker 1 climbs into the top 50, maker 2 falls out of it; maker 3 stays outside both times
+    assert gainers.iloc[0][["Maker_ID", "Previous_Rank", "Rank", "Rank_change"]].tolist() == [1, 60, 40, 20]
+    assert losers.iloc[0][["Maker_ID", "Previous_Rank", "Rank", "Rank_change"]].tolist() == [2, 45, 70, -25]
+    assert 3 not in movers["Maker_ID"].tolist()
+    assert (movers["Quarter_Key"] == 101).all()
+
+
+def test_movers_break_equal_changes_by_current_rank_and_stop_at_top_n():
+    previous = {1: 5, 2: 6, 3: 7, 4: 1, 5: 2, 6: 3, 7: 4}
+    current = {1: 2, 2: 3, 3: 1, 4: 4, 5: 5, 6: 6, 7: 7}
+    movers = top_movers(market(previous, current), "Quarter_Key", ["QoQ"], top_n=2)
+    gainers = movers[movers["Direction"] == "Gainer"]
+    losers = movers[movers["Direction"] == "Loser"]
+    assert gainers["Maker_ID"].tolist() == [3, 1]
+    assert gainers["Position"].tolist() == [1, 2]
+    assert losers["Maker_ID"].tolist() == [4, 5]
+    assert losers["Rank_change"].tolist() == [-3, -3]
+
+
+def test_no_movers_without_a_previous_period():
+    ranks = ranked([(1, 100, 50), (2, 100, 40)], {"QoQ": 1})
+    assert top_movers(ranks, "Quarter_Key", ["QoQ"]).empty
+
+
+def shares(rows):
+    """Market share of (Maker_ID, Year, Registrations) rows."""
+    return compute_market_share(pd.DataFrame(rows, columns=["Maker_ID", "Year", "Registrations"]), "Year")
+
+
+def share_of(share_df, maker_id, year, col="Share_pct"):
+    return share_df[(share_df["Maker_ID"] == maker_id) & (share_df["Year"] == year)][col].iloc[0]
+
+
+MARKET = [(maker, 2020, value) for maker, value in enumerate([500, 200, 100, 100, 50, 30, 20], start=1)]
+MARKET += [(maker, 2021, value) for maker, value in enumerate([300, 300, 200, 100, 50, 30, 20], start=1)]
+
+
+def test_shares_sum_to_100_per_period_and_change_in_points():
+    share_df = shares(MARKET)
+    assert share_df.groupby("Year")["Share_pct"].sum().tolist() == pytest.approx([100, 100])
+    assert share_of(share_df, 1, 2020) == 50.0
+    assert share_of(share_df, 1, 2021, "Share_change_pp") == pytest.approx(30.0 - 50.0)
+    assert share_df[share_df["Year"] == 2020]["Share_change_pp"].isna().all()
+
+
+def test_hhi_is_the_sum_of_squared_percentage_shares_with_the_top_n_share():
+    share_df = shares(MARKET)
+    concentration = compute_concentration(share_df, "Year")
+    expected_hhi = share_df.groupby("Year")["Share_pct"].apply(lambda s: (s ** 2).sum()).round(2)
+    assert concentration["HHI"].tolist() == expected_hhi.tolist()
+    assert concentration.loc[0, "HHI"] == pytest.approx(50 ** 2 + 20 ** 2 + 10 ** 2 * 2 + 5 ** 2 + 3 ** 2 + 2 ** 2)
+    assert concentration["Top5_share_pct"].tolist() == [95.0, 95.0]
+    assert compute_concentration(share_df, "Year", top_n=2)["Top2_share_pct"].tolist() == [70.0, 60.0]
+    assert concentration["Active_Makers"].tolist() == [7, 7]
+    assert np.isnan(concentration.loc[0, "HHI_change"])
+    assert concentration.loc[1, "HHI_change"] == pytest.approx(concentration.loc[1, "HHI"] - concentration.loc[0, "HHI"])
+
+
+def test_no_change_is_reported_across_a_missing_period():
+    # 2021 has no rows, and maker 2 skips 2022 as well
+    share_df = shares([(1, 2020, 60), (2, 2020, 40), (1, 2022, 70), (3, 2022, 30), (1, 2023, 50), (2, 2023, 50)])
+    assert np.isnan(share_of(share_df, 1, 2022, "Share_change_pp"))
+    assert np.isnan(share_of(share_df, 2, 2023, "Share_change_pp"))
+    assert share_of(share_df, 1, 2023, "Share_change_pp") == -20.0
+    concentration = compute_concentration(share_df, "Year")
+    assert concentration["Year"].tolist() == [2020, 2022, 2023]
+    assert np.isnan(concentration.loc[1, "HHI_change"])
+    assert concentration.loc[2, "HHI_change"] == pytest.approx(5000 - 5800)
+
+
+def test_period_without_registrations_has_no_shares_or_concentration():
+    share_df = shares([(1, 2020, 60), (2, 2020, 40), (1, 2021, 0), (2, 2021, 0), (1, 2022, 50), (2, 2022, 50)])
+    assert share_df[share_df["Year"] == 2021]["Share_pct"].isna().all()
+    assert share_df[share_df["Year"] == 2022]["Share_change_pp"].isna().all()
+    concentration = compute_concentration(share_df, "Year")
+    zero = concentration[concentration["Year"] == 2021].iloc[0]
+    assert zero["Total_Registrations"] == 0 and zero["Active_Makers"] == 0
+    assert np.isnan(zero["HHI"]) and np.isnan(zero["Top5_share_pct"])
+    assert concentration["HHI_change"].isna().all()
@@ -0,0 +1,42 @@
+import glob
+import os
+
+import pandas as pd
+import pytest
+
+from monthly_data_processing import PARTIAL_MONTH_RATIO, load_monthly_csv, ytd_output
+from time_buckets import MONTHS, month_key
+
+MONTHLY_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "monthly")
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(MONTHLY_DIR, "*_monthly_*.csv"))), ids=os.path.basename)
+def test_monthly_csv_months_and_total(path):
+    # Partial years must name their last column TOTAL, not the next month
+    df = load_monthly_csv(path)
+    month_cols = [col for col in df.columns if col in MONTHS]
+    assert month_cols == MONTHS[:len(month_cols)]
+    assert df.columns[-1] == "TOTAL"
+    assert (df[month_cols].sum(axis=1) == df["TOTAL"]).all()
+
+
+def ytd_with_latest_month(share):
+    """YTD cube of two groups with a full 2024 and 2025 through APR, where APR is `share` of APR 2024."""
+    rows = []
+    for group, scale in (("2W", 1000), ("4W", 100)):
+        rows += [(group, month_key(2024, month), scale) for month in range(1, 13)]
+        rows += [(group, month_key(2025, month), scale * 1.1) for month in range(1, 4)]
+        rows.append((group, month_key(2025, 4), scale * share))
+    return ytd_output(pd.DataFrame(rows, columns=["Group", "Month_Key", "Registrations"]), ["Group"])
+
+
+def test_latest_month_well_below_a_year_earlier_is_flagged_partial():
+    ytd = ytd_with_latest_month(0.2)
+    flagged = ytd[ytd["Partial_Month"]]
+    assert sorted(flagged["Group"]) == ["2W", "4W"]
+    assert (flagged["Year"] == 2025).all() and (flagged["Through_Month"] == "APR").all()
+
+
+@pytest.mark.parametrize("share", [0.9, PARTIAL_MONTH_RATIO])
+def test_latest_month_near_a_year_earlier_is_not_flagged(share):
+    assert not ytd_with_latest_month(share)["Partial_Month"].any()
@@ -0,0 +1,122 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+import pipeline_refresh
+from monthly_data_cleaning import needs_conversion, process_all_monthly_files
+from pipeline_refresh import DataStore, RefreshJob, publish_staged, run_step, stage_processed_dir
+from snapshot import SNAPSHOT_FILENAME
+
+
+@pytest.fixture
+def scripts(tmp_path, monkeypatch):
+    """Point run_step at a temporary src/ directory and return a function writing scripts into it."""
+    monkeypatch.setattr(pipeline_refresh, "SRC_DIR", str(tmp_path))
+
+    def write(name, source):
+        (tmp_path / name).write_text(source)
+        return name
+
+    return write
+
+
+@pytest.mark.skipif(not pipeline_refresh.NICE_PREFIX, reason="nice(1) is not available")
+def test_steps_run_at_lower_priority(scripts):
+    lines = []
+    script = scripts("niceness.py", "import os\nprint(os.nice(0))\n")
+    assert run_step([script], lines.append) == 0
+    assert int(lines[-1]) == min(os.nice(0) + 10, 19)
+
+
+def test_step_output_and_exit_code_are_passed_on(scripts):
+    lines = []
+    script = scripts("failing.py", "import sys\nprint(sys.argv[1:])\nraise SystemExit(3)\n")
+    assert run_step([script, "--all"], lines.append) == 3
+    assert lines == ["['--all']"]
+
+
+def touch(path, mtime):
+    path.write_bytes(b"")
+    os.utime(path, (mtime, mtime))
+
+
+def test_only_changed_excel_files_are_reconverted(tmp_path):
+    touch(tmp_path / "2024_monthly_VC.xlsx", 1000)
+    touch(tmp_path / "2024_monthly_VC.csv", 2000)
+    touch(tmp_path / "2025_monthly_VC.xlsx", 3000)
+    touch(tmp_path / "2025_monthly_VC.csv", 2000)
+    assert not needs_conversion(str(tmp_path / "2024_monthly_VC.xlsx"), str(tmp_path / "2024_monthly_VC.csv"))
+    assert needs_conversion(str(tmp_path / "2025_monthly_VC.xlsx"), str(tmp_path / "2025_monthly_VC.csv"))
+    assert needs_conversion(str(tmp_path / "2025_monthly_VC.xlsx"), str(tmp_path / "2025_monthly_MAKER.csv"))
+
+
+def test_unchanged_excel_files_are_skipped_and_keep_their_csv(tmp_path):
+    touch(tmp_path / "2024_monthly_MAKER.xlsx", 1000)
+    touch(tmp_path / "2024_monthly_MAKER.csv", 2000)
+    assert process_all_monthly_files(str(tmp_path), only_changed=True) == []
+    assert os.path.getmtime(tmp_path / "2024_monthly_MAKER.csv") == 2000
+
+
+# A step that rewrites maker_yoy.csv in the directory it is pointed at, as the pipelines do
+REWRITE_MAKERS = """import os
+path = os.path.join(os.environ["DASHBOARD_PROCESSED_DIR"], "maker_yoy.csv")
+with open(path, "w") as f:
+    f.write("Maker_ID,Maker,Year,Registrations,YoY_pct\\n1,HERO MOTOCORP LTD,2021,100,\\n1,HERO MOTOCORP LTD,2022,300,200.0\\n")
+print("rewrote", path)
+"""
+
+
+def run_refresh(job, mode):
+    assert job.start(mode)
+    while job.status()["state"] == "running":
+        time.sleep(0.05)
+    return job.status()
+
+
+def staging_dirs(processed_dir):
+    return [name for name in os.listdir(os.path.dirname(processed_dir)) if name.startswith(".refresh-")]
+
+
+def test_refresh_publishes_staged_outputs_and_swaps_them_in(processed_dir, scripts, monkeypatch):
+    monkeypatch.setitem(pipeline_refresh.REFRESH_MODES, "test", [[scripts("rewrite.py", REWRITE_MAKERS)]])
+    store = DataStore(processed_dir)
+    swaps = []
+    status = run_refresh(RefreshJob(store, on_swap=lambda: swaps.append(1)), "test")
+
+    assert status["state"] == "succeeded", status
+    assert pd.read_csv(os.path.join(processed_dir, "maker_yoy.csv"))["Registrations"].tolist() == [100, 300]
+    assert store.current[0][1]["Registrations"].tolist() == [100, 300]
+    assert swaps == [1]
+    assert staging_dirs(processed_dir) == []
+
+
+def test_failed_refresh_leaves_processed_files_and_served_data_untouched(processed_dir, scripts, monkeypatch):
+    failing = scripts("failing.py", "raise SystemExit(1)\n")
+    monkeypatch.setitem(pipeline_refresh.REFRESH_MODES, "test", [[scripts("rewrite.py", REWRITE_MAKERS)], [failing]])
+    before = {name: os.stat(os.path.join(processed_dir, name)).st_mtime_ns for name in os.listdir(processed_dir)}
+    store = DataStore(processed_dir)
+    served = store.current
+    status = run_refresh(RefreshJob(store), "test")
+
+    assert status["state"] == "failed"
+    assert status["error"] == "failing.py exited with code 1"
+    assert {name: os.stat(os.path.join(processed_dir, name)).st_mtime_ns for name in os.listdir(processed_dir)} == before
+    assert store.current is served
+    assert staging_dirs(processed_dir) == []
+
+
+def test_publish_moves_the_snapshot_first_and_skips_unchanged_copies(processed_dir, write_processed):
+    staging_dir = stage_processed_dir(processed_dir)
+    assert sorted(os.listdir(staging_dir)) == sorted(os.listdir(processed_dir))
+    assert publish_staged(staging_dir, processed_dir) == []
+
+    staging_dir = stage_processed_dir(processed_dir)
+    write_processed(staging_dir, registrations_2022=250)
+    os.utime(os.path.join(staging_dir, SNAPSHOT_FILENAME))
+    published = publish_staged(staging_dir, processed_dir)
+    assert published[0] == SNAPSHOT_FILENAME
+    assert sorted(published[1:]) == sorted([
+        "maker_quarterly_qoq.csv", "maker_yoy.csv", "vehicle_category_group_yoy.csv", "vehicle_category_quarterly_qoq.csv",
+    ])
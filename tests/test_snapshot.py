@@ -0,0 +1,72 @@
+import os
+import pickle
+
+import pandas as pd
+
+import snapshot
+from dashboard_data import load_dashboard_data
+from snapshot import load_snapshot, snapshot_path
+
+
+def age_snapshot(processed_dir, seconds=60):
+    """Backdate the snapshot so a rewritten CSV is unambiguously newer, whatever the mtime resolution."""
+    built_at = os.path.getmtime(snapshot_path(processed_dir)) - seconds
+    os.utime(snapshot_path(processed_dir), (built_at, built_at))
+
+
+def test_fresh_snapshot_is_used(processed_dir):
+    loaded = load_snapshot(processed_dir)
+    assert loaded is not None
+    assert loaded["options"]["years"] == [2021, 2022]
+    assert loaded["frames"][1]["Registrations"].tolist() == [100, 200]
+
+
+def test_options_header_reads_without_frames(processed_dir):
+    loaded = load_snapshot(processed_dir, with_frames=False)
+    assert set(loaded) == {"options"}
+
+
+def test_missing_snapshot_falls_back_to_csvs(processed_dir):
+    os.remove(snapshot_path(processed_dir))
+    frames, _, options = load_dashboard_data(processed_dir)
+    assert load_snapshot(processed_dir) is None
+    assert frames[0]["Registrations"].tolist() == [100, 200]
+    assert options["top_makers"] == [1]
+
+
+def test_stale_snapshot_falls_back_to_csvs(processed_dir, write_processed):
+    age_snapshot(processed_dir)
+    write_processed(processed_dir, registrations_2022=250)
+    assert load_snapshot(processed_dir) is None
+    frames, _, _ = load_dashboard_data(processed_dir)
+    assert frames[0]["Registrations"].tolist() == [100, 250]
+    assert frames[1]["Registrations"].tolist() == [100, 250]
+
+
+def test_newer_extra_table_makes_snapshot_stale(processed_dir):
+    age_snapshot(processed_dir)
+    pd.DataFrame({"Maker_ID": [1], "Year": [2022]}).to_csv(
+        os.path.join(processed_dir, "maker_share_yearly.csv"), index=False
+    )
+    assert load_snapshot(processed_dir) is None
+    _, extras, _ = load_dashboard_data(processed_dir)
+    assert "maker_share_yearly" in extras
+
+
+def test_other_version_snapshot_falls_back_to_csvs(processed_dir, monkeypatch):
+    # A snapshot pickled by older code is ignored even though no CSV changed since
+    monkeypatch.setattr(snapshot, "SNAPSHOT_VERSION", snapshot.SNAPSHOT_VERSION + 1)
+    assert load_snapshot(processed_dir) is None
+    assert load_snapshot(processed_dir, with_frames=False) is None
+    frames, _, options = load_dashboard_data(processed_dir)
+    assert frames[1]["Registrations"].tolist() == [100, 200]
+    assert options["years"] == [2021, 2022]
+
+
+def test_old_version_header_is_not_unpickled_further(processed_dir):
+    with open(snapshot_path(processed_dir), "wb") as f:
+        pickle.dump({"version": snapshot.SNAPSHOT_VERSION - 1, "options": {}}, f)
+        f.write(b"frames pickled by older code")
+    assert load_snapshot(processed_dir) is None
+    frames, _, _ = load_dashboard_data(processed_dir)
+    assert frames[0]["Registrations"].tolist() == [100, 200]
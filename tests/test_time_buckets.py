@@ -0,0 +1,133 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from monthly_data_processing import VC_GROUP_MAP, load_monthly_csv, vc_monthly_rows
+from time_buckets import BUCKET_SPECS, MONTHS, aggregate_buckets, bucket_keys, compute_growth, month_key
+
+MONTHLY_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "monthly")
+
+
+def monthly_rows(entity, start, values):
+    """Long monthly rows for one entity from (year, month) `start` onwards."""
+    first = month_key(*start)
+    return pd.DataFrame({
+        "Maker_ID": entity, "Month_Key": range(first, first + len(values)), "Registrations": values,
+    })
+
+
+def bucket_row(buckets, name, entity, label):
+    rows = buckets[name]
+    return rows[(rows["Maker_ID"] == entity) & (rows["Period"] == label)].iloc[0]
+
+
+@pytest.mark.parametrize("year, month, fiscal_year", [
+    (2025, 3, "FY2024-25"), (2025, 4, "FY2025-26"), (2025, 12, "FY2025-26"), (2026, 1, "FY2025-26"),
+    (2026, 3, "FY2025-26"), (2026, 4, "FY2026-27"), (2099, 4, "FY2099-00"),
+])
+def test_fiscal_year_starts_in_april(year, month, fiscal_year):
+    spec = BUCKET_SPECS["fiscal_year"]
+    key = bucket_keys([month_key(year, month)], spec["months"], spec["start_month"])
+    assert spec["label"](key) == [fiscal_year]
+
+
+@pytest.mark.parametrize("year, month, fiscal_quarter", [
+    (2025, 3, "FY2024-25 Q4"), (2025, 4, "FY2025-26 Q1"), (2025, 6, "FY2025-26 Q1"), (2025, 7, "FY2025-26 Q2"),
+    (2025, 12, "FY2025-26 Q3"), (2026, 1, "FY2025-26 Q4"),
+])
+def test_fiscal_quarters_start_in_april(year, month, fiscal_quarter):
+    spec = BUCKET_SPECS["fiscal_quarter"]
+    key = bucket_keys([month_key(year, month)], spec["months"], spec["start_month"])
+    assert spec["label"](key) == [fiscal_quarter]
+
+
+def test_calendar_year_splits_into_two_fiscal_years():
+    buckets = aggregate_buckets(monthly_rows(1, (2024, 1), [1] * 12), ["Maker_ID"])
+    assert bucket_row(buckets, "fiscal_year", 1, "FY2023-24")[["Registrations", "Months"]].tolist() == [3, 3]
+    assert bucket_row(buckets, "fiscal_year", 1, "FY2024-25")[["Registrations", "Months"]].tolist() == [9, 9]
+    assert buckets["fiscal_quarter"]["Period"].tolist() == [
+        "FY2023-24 Q4", "FY2024-25 Q1", "FY2024-25 Q2", "FY2024-25 Q3",
+    ]
+    assert bucket_row(buckets, "calendar_year", 1, "2024")[["Registrations", "Months"]].tolist() == [12, 12]
+
+
+def test_months_counts_the_covered_months_of_a_partial_bucket():
+    # Data runs Jan-Aug 2025: Q3 covers two months, H2 two, the calendar year eight
+    buckets = aggregate_buckets(monthly_rows(1, (2025, 1), [10] * 8), ["Maker_ID"])
+    assert bucket_row(buckets, "calendar_quarter", 1, "2025-Q3")[["Registrations", "Months"]].tolist() == [20, 2]
+    assert bucket_row(buckets, "half_year", 1, "2025-H2")["Months"] == 2
+    assert bucket_row(buckets, "calendar_year", 1, "2025")["Months"] == 8
+
+
+def test_entity_without_data_in_a_bucket_gets_no_row():
+    # Maker 2 has no rows before April and only missing values in Q2
+    long_df = pd.concat([
+        monthly_rows(1, (2024, 1), [5] * 9),
+        monthly_rows(2, (2024, 4), [np.nan, np.nan, np.nan, 7, 7, 7]),
+    ])
+    quarters = aggregate_buckets(long_df, ["Maker_ID"])["calendar_quarter"]
+    assert quarters[quarters["Maker_ID"] == 1]["Period"].tolist() == ["2024-Q1", "2024-Q2", "2024-Q3"]
+    assert quarters[quarters["Maker_ID"] == 2]["Period"].tolist() == ["2024-Q3"]
+
+
+def test_growth_is_gated_off_for_partial_buckets():
+    # Q2 2025 is complete, Q3 2025 has only two months collected
+    quarters = aggregate_buckets(monthly_rows(1, (2025, 1), [10] * 8), ["Maker_ID"])["calendar_quarter"]
+    growth = compute_growth(quarters, ["Maker_ID"]).set_index("Period")["Growth_pct"]
+    assert growth["2025-Q2"] == 0.0
+    assert np.isnan(growth["2025-Q3"])
+    assert np.isnan(growth["2025-Q1"])
+
+
+def test_growth_compares_equally_partial_buckets():
+    periods = pd.DataFrame({
+        "Maker_ID": [1, 1], "Period_Key": [2024, 2025], "Registrations": [80.0, 100.0], "Months": [8, 8],
+    })
+    growth = compute_growth(periods, ["Maker_ID"])["Growth_pct"]
+    assert np.isnan(growth[0])
+    assert growth[1] == 25.0
+
+
+def test_growth_needs_the_immediately_preceding_period_and_a_nonzero_base():
+    periods = pd.DataFrame({
+        "Maker_ID": [1, 1, 1, 2, 2],
+        "Period_Key": [10, 12, 13, 10, 11],
+        "Registrations": [50.0, 60.0, 90.0, 0.0, 40.0],
+        "Months": [3] * 5,
+    })
+    growth = compute_growth(periods, ["Maker_ID"])
+    assert growth["Growth_pct"].isna().tolist() == [True, True, False, True, True]
+    assert growth.loc[2, "Growth_pct"] == 50.0
+
+
+def reference_vc_quarters(vc_df, year):
+    """The baseline's quarter sums: each row's months summed per calendar quarter, then per vehicle group."""
+    quarter_map = {month: f"Q{index // 3 + 1}" for index, month in enumerate(MONTHS)}
+    rows = []
+    for group, keywords in VC_GROUP_MAP.items():
+        subset = vc_df[vc_df["Vehicle Category"].str.contains("|".join(keywords), case=False, na=False)]
+        for _, row in subset.iterrows():
+            for quarter in ["Q1", "Q2", "Q3", "Q4"]:
+                quarter_months = [month for month, q in quarter_map.items() if q == quarter and month in vc_df.columns]
+                if quarter_months:
+                    total = sum(row[month] for month in quarter_months if pd.notna(row[month]))
+                    rows.append({"Group": group, "Period": f"{year}-{quarter}", "Registrations": total})
+    return pd.DataFrame(rows).groupby(["Group", "Period"])["Registrations"].sum()
+
+
+def test_vc_quarter_sums_match_the_baseline_aggregation():
+    paths = sorted(glob.glob(os.path.join(MONTHLY_DIR, "*_monthly_VC.csv")))
+    assert paths
+    long_rows, reference = [], []
+    for path in paths:
+        year = int(os.path.basename(path)[:4])
+        vc_df = load_monthly_csv(path)
+        long_rows.append(vc_monthly_rows(vc_df, year))
+        reference.append(reference_vc_quarters(vc_df, year))
+    quarters = aggregate_buckets(pd.concat(long_rows), ["Group"])["calendar_quarter"]
+    new = quarters.set_index(["Group", "Period"])["Registrations"].sort_index()
+    expected = pd.concat(reference).sort_index()
+    pd.testing.assert_series_equal(new, expected.astype(float), check_names=False)